@@ -24,9 +24,10 @@ Key customizations (relative to the default Alembic template):
     - The SQLAlchemy connection URL is dynamically sourced from
       ``app.config.settings.DATABASE_URL`` (loaded from environment
       variables / ``.env``), overriding the static value in ``alembic.ini``.
-    - All ORM models (``User``, ``Prediction``) are explicitly imported to
-      ensure Alembic's ``--autogenerate`` detects every table, column, and
-      constraint.
+    - Every module of the ``app`` package (except the routers and the
+      ML stack) is discovered through ``pkgutil`` and imported so that all
+      ORM models are registered on ``Base.metadata`` and Alembic's
+      ``--autogenerate`` detects every table, column, and constraint.
     - ``compare_type=True`` and ``compare_server_default=True`` are enabled
       so that autogenerate picks up column type changes and server default
       modifications — not just structural additions/removals.
@@ -44,9 +45,10 @@ from logging.config import fileConfig
 from sqlalchemy import engine_from_config
 from sqlalchemy import pool
 from alembic import context
+import importlib
+import pkgutil
 import sys
 import os
-from pathlib import Path
 
 # ------------------------------------------------------------------------------
 # Python Path Configuration
@@ -56,8 +58,12 @@ from pathlib import Path
 # ``from app.xxx import ...`` statements work correctly even when Alembic is
 # invoked from a different working directory (e.g., the project root or a
 # CI runner).
+#
+# ``os.path.abspath`` is used instead of ``Path.resolve()``: it only joins
+# with the working directory and skips the ``realpath`` syscalls, which is
+# enough since the directory is only used as an import root.
 # ------------------------------------------------------------------------------
-api_dir = str(Path(__file__).resolve().parent.parent)
+api_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 if api_dir not in sys.path:
     sys.path.insert(0, api_dir)
 
@@ -67,21 +73,47 @@ if api_dir not in sys.path:
 # Import the application settings to obtain the database URL at runtime,
 # and the declarative Base to provide Alembic with the target metadata.
 # ------------------------------------------------------------------------------
+import app
 from app.config import settings
 from app.database import Base
 
 # ------------------------------------------------------------------------------
-# Explicit Model Imports
+# Model Discovery
 # ------------------------------------------------------------------------------
-# All SQLAlchemy ORM models MUST be imported here so that their table
-# definitions are registered on ``Base.metadata`` before Alembic inspects it.
-# Without these imports, ``--autogenerate`` would see an empty metadata
-# object and generate no migration operations (or even drop existing tables).
+# All SQLAlchemy ORM models MUST be imported before Alembic inspects
+# ``Base.metadata``; otherwise ``--autogenerate`` would see an incomplete
+# metadata object and silently drop the missing tables. Rather than listing
+# models by hand, every module of the ``app`` package is imported so that
+# any new model is registered as a side effect of its import.
 #
-# When adding a new model to the application, add a corresponding import
-# line here to keep autogenerate in sync.
+# Modules in the blocklist are skipped: the routers and the LPR pipeline pull
+# in FastAPI endpoints and the ML stack (torch, cv2, onnxruntime), which adds
+# seconds to every migration command and defines no tables.
 # ------------------------------------------------------------------------------
-from app.database import User, Prediction
+_MODEL_DISCOVERY_BLOCKLIST = (
+    "app.main",
+    "app.routers",
+    "app.model",
+    "app.predictor",
+)
+
+
+def _import_app_modules(path=app.__path__, prefix: str = "app.") -> None:
+    """Recursively import every ``app`` module outside the blocklist.
+
+    Unlike ``pkgutil.walk_packages``, which imports every package it walks,
+    blocklisted packages are neither imported nor descended into, so none
+    of their submodules are loaded either.
+    """
+    for module in pkgutil.iter_modules(path, prefix):
+        if module.name.startswith(_MODEL_DISCOVERY_BLOCKLIST):
+            continue
+        imported = importlib.import_module(module.name)
+        if module.ispkg:
+            _import_app_modules(imported.__path__, module.name + ".")
+
+
+_import_app_modules()
 
 # ------------------------------------------------------------------------------
 # Alembic Config Object
@@ -105,9 +137,21 @@ config.set_main_option("sqlalchemy.url", settings.DATABASE_URL)
 # ``alembic.ini`` and applies them via Python's ``logging.config``.
 # The guard avoids a TypeError when config_file_name is None (e.g., when
 # Alembic is used programmatically without an .ini file).
+#
+# ``disable_existing_loggers=False`` keeps the application loggers alive
+# when Alembic is invoked programmatically. The setup runs only once per
+# ``Config`` object: repeated commands sharing it (test suites, scripts
+# chaining upgrade/downgrade) skip re-parsing the INI and rebuilding the
+# logging tree. Callers that manage logging themselves can opt out with
+# ``config.attributes["configure_logger"] = False``.
 # ------------------------------------------------------------------------------
-if config.config_file_name is not None:
-    fileConfig(config.config_file_name)
+if (
+    config.config_file_name is not None
+    and config.attributes.get("configure_logger", True)
+    and not config.attributes.get("logging_configured", False)
+):
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+    config.attributes["logging_configured"] = True
 
 # ------------------------------------------------------------------------------
 # Target Metadata
@@ -160,9 +204,13 @@ def run_migrations_online() -> None:
     SQLAlchemy engine built from ``alembic.ini`` settings (with the URL
     overridden by ``app.config.settings.DATABASE_URL``).
 
-    The connection uses ``pool.NullPool`` to avoid keeping idle connections
-    open after the migration process completes. Each migration command gets
-    a fresh connection that is closed immediately after use.
+    The engine uses a single-connection ``pool.QueuePool`` (``pool_size=1``,
+    ``max_overflow=0``) so that the connection opened for the migration is
+    reused by every operation, including autogenerate reflection, instead
+    of reconnecting. The engine is disposed in a ``finally`` block so no
+    idle connection outlives the command. With SQLAlchemy 2.x and Alembic
+    ≥ 1.13, autogenerate reflects all tables through the batched
+    ``Inspector`` API on this single connection.
 
     Configuration options:
         ``compare_type=True``
@@ -170,26 +218,38 @@ def run_migrations_online() -> None:
         ``compare_server_default=True``
             Enables server default change detection during autogenerate.
 
-    The migration operations are wrapped in a transaction so that a failure
-    in any individual migration step rolls back the entire batch, leaving
-    the database in a consistent state.
+    The migration operations are wrapped in a single top-level transaction
+    (``transaction_per_migration=False``): every pending revision runs on
+    the same connection and is committed once at the end, so a failure in
+    any individual step rolls back the entire batch, leaving the database
+    in a consistent state. PostgreSQL DDL is transactional, so no
+    per-statement autocommit is needed.
     """
     connectable = engine_from_config(
         config.get_section(config.config_ini_section, {}),
         prefix="sqlalchemy.",
-        poolclass=pool.NullPool,
+        poolclass=pool.QueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_pre_ping=True,
     )
 
-    with connectable.connect() as connection:
-        context.configure(
-            connection=connection,
-            target_metadata=target_metadata,
-            compare_type=True,
-            compare_server_default=True,
-        )
+    try:
+        with connectable.connect() as connection:
+            context.configure(
+                connection=connection,
+                target_metadata=target_metadata,
+                compare_type=True,
+                compare_server_default=True,
+                include_schemas=False,
+                transaction_per_migration=False,
+                render_as_batch=False,
+            )
 
-        with context.begin_transaction():
-            context.run_migrations()
+            with context.begin_transaction():
+                context.run_migrations()
+    finally:
+        connectable.dispose()
 
 
 # ------------------------------------------------------------------------------
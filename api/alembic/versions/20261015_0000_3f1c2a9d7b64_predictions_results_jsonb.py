@@ -0,0 +1,40 @@
+"""Convert predictions.results from json to jsonb
+
+Revision ID: 3f1c2a9d7b64
+Revises: 
+Create Date: 2026-10-15 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "3f1c2a9d7b64"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The cast is a no-op on databases whose table was already created
+    # with jsonb by ``create_tables()``.
+    op.alter_column(
+        "predictions",
+        "results",
+        type_=postgresql.JSONB(),
+        existing_nullable=False,
+        postgresql_using="results::jsonb",
+    )
+
+
+def downgrade() -> None:
+    op.alter_column(
+        "predictions",
+        "results",
+        type_=sa.JSON(),
+        existing_nullable=False,
+        postgresql_using="results::json",
+    )
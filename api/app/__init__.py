@@ -21,7 +21,7 @@ Structure du package :
     - ``crud.py``          — Fonctions CRUD pour les opérations sur
       les utilisateurs et les prédictions.
     - ``security.py``      — Utilitaires de hachage et de vérification
-      de mots de passe (bcrypt via Passlib).
+      de mots de passe (bcrypt).
     - ``predictor.py``     — Wrapper du pipeline de reconnaissance de
       plaques pour l'intégration avec FastAPI.
     - ``routers/``         — Sous-package contenant les routeurs
@@ -29,5 +29,49 @@ Structure du package :
     - ``model/``           — Sous-package contenant le pipeline LPR
       (détection YOLO + lecture OCR).
 
+Chargement paresseux (PEP 562) :
+    Les attributs ``predictor`` et ``plate_predictor`` ne sont importés
+    qu'au premier accès (``app.plate_predictor``), via ``__getattr__``.
+    Un simple ``import app`` (scripts CLI, migrations Alembic) ne charge
+    donc jamais la pile ML (torch, OpenCV, onnxruntime).
+
 Version : 1.0.0
-"""
\ No newline at end of file
+"""
+
+import importlib
+
+# Attributs chargés à la demande : nom exposé -> (module, attribut).
+# Un attribut ``None`` signifie que le module lui-même est retourné.
+_LAZY = {
+    "predictor": ("app.predictor", None),
+    "plate_predictor": ("app.predictor", "plate_predictor"),
+}
+
+
+def __getattr__(name: str):
+    """
+    Importer à la demande les sous-modules lourds du package.
+
+    Appelée par Python uniquement lorsqu'un attribut n'est pas trouvé
+    dans le namespace du package. La valeur résolue est mémorisée dans
+    ``globals()`` afin que les accès suivants ne repassent pas par ici.
+
+    Args:
+        name (str): Nom de l'attribut demandé.
+
+    Returns:
+        object: Module ou objet correspondant à ``name``.
+
+    Raises:
+        AttributeError: Si ``name`` ne correspond à aucun attribut
+            chargeable paresseusement.
+    """
+    target = _LAZY.get(name)
+    if target is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    module_name, attribute = target
+    module = importlib.import_module(module_name)
+    value = module if attribute is None else getattr(module, attribute)
+    globals()[name] = value
+    return value
\ No newline at end of file
@@ -2,21 +2,23 @@
 auth.py — Module d'authentification et de sécurité pour l'API SnapTaPlaque.
 
 Ce module centralise l'ensemble de la logique d'authentification de
-l'application : hachage et vérification des mots de passe, création et
+l'application : vérification des mots de passe, création et
 décodage des tokens JWT, ainsi que les dépendances FastAPI permettant
 d'extraire et de valider l'utilisateur courant à partir d'une requête
 authentifiée.
 
 Composants exposés :
-    - ``get_password_hash``       — Hache un mot de passe en clair avec bcrypt.
     - ``verify_password``         — Compare un mot de passe en clair avec
-      son hash bcrypt.
+      son hash bcrypt, en s'appuyant sur un cache LRU borné des
+      vérifications réussies.
     - ``create_access_token``     — Génère un token JWT signé avec une
       durée de vie configurable.
     - ``decode_access_token``     — Décode et valide un token JWT, levant
       une erreur HTTP 401 si le token est invalide ou expiré.
     - ``get_current_user``        — Dépendance FastAPI extrayant l'utilisateur
       authentifié à partir du token Bearer.
+    - ``invalidate_cached_user``  — Retire un utilisateur du cache
+      d'authentification après modification de son compte.
     - ``get_current_active_user`` — Dépendance FastAPI vérifiant que
       l'utilisateur authentifié possède un compte actif.
 
@@ -26,22 +28,37 @@ Configuration :
     - ``ALGORITHM``                   — Algorithme de signature JWT (HS256).
     - ``ACCESS_TOKEN_EXPIRE_MINUTES`` — Durée de validité par défaut des
       tokens (60 minutes).
+    - ``BCRYPT_ROUNDS``               — Facteur de coût bcrypt appliqué
+      lors du hachage des mots de passe (voir ``app.security``).
+    - ``AUTH_VERIFY_CACHE``           — Active le cache des vérifications
+      de mots de passe réussies.
 
 Version : 1.0.0
 """
 
-from datetime import datetime, timedelta
-
-from jose import jwt, JWTError
+import base64
+import hashlib
+import hmac
+import threading
+import time
+from datetime import timedelta
+from functools import lru_cache
+from typing import Optional
+
+import jwt
+import orjson
+from cachetools import LRUCache, TTLCache
+from jwt import DecodeError, InvalidTokenError
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
-from passlib.context import CryptContext
-
 from app.database import get_db
 
 from app import crud, database
 from app.config import settings
+# Hachage et vérification bcrypt, partagés avec ``crud`` (voir
+# ``app.security``).
+from app import security
 
 # ================== CONFIG ==================
 
@@ -50,6 +67,10 @@ from app.config import settings
 # ou fichier .env). Elle ne doit jamais être exposée publiquement.
 SECRET_KEY = settings.SECRET_KEY
 
+# Clé secrète encodée une seule fois en octets à l'import, pour éviter
+# un ``str.encode()`` à chaque signature ou vérification de token.
+SECRET_KEY_BYTES = SECRET_KEY.encode("utf-8")
+
 # Algorithme de signature utilisé pour l'encodage et le décodage des
 # tokens JWT. HS256 (HMAC-SHA256) est un algorithme symétrique : la même
 # clé sert à signer et à vérifier.
@@ -60,35 +81,105 @@ ALGORITHM = "HS256"
 # doit se ré-authentifier.
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
 
-# Schéma OAuth2 « Bearer token » utilisé par FastAPI pour extraire
-# automatiquement le token JWT depuis l'en-tête ``Authorization``.
-# Le paramètre ``tokenUrl`` indique l'endpoint de connexion pour la
-# documentation interactive Swagger UI.
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/v1/account/login")
+# Durée de validité par défaut exprimée en secondes, précalculée une
+# seule fois pour construire directement le claim ``exp`` (timestamp
+# POSIX entier) sans passer par des objets ``datetime``.
+DEFAULT_TTL = ACCESS_TOKEN_EXPIRE_MINUTES * 60
 
-# Contexte de hachage Passlib configuré avec l'algorithme bcrypt.
-# L'option ``deprecated="auto"`` permet de migrer automatiquement les
-# anciens schémas de hachage lors de la prochaine vérification.
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
-# ================== PASSWORD ==================
-def get_password_hash(password: str) -> str:
+class _OrjsonPyJWT(jwt.PyJWT):
+    """
+    Variante de ``PyJWT`` désérialisant le payload avec ``orjson``.
+
+    Surcharge le point d'extension prévu par PyJWT pour le décodage du
+    payload ; la vérification de la signature et la validation des
+    claims restent celles de PyJWT.
     """
-    Hacher un mot de passe en clair avec bcrypt.
 
-    Utilise le contexte Passlib configuré pour produire un hash bcrypt
-    sécurisé, incluant un sel aléatoire généré automatiquement.
+    def _decode_payload(self, decoded: dict) -> dict:
+        try:
+            payload = orjson.loads(decoded["payload"])
+        except orjson.JSONDecodeError as e:
+            raise DecodeError(f"Invalid payload string: {e}") from e
+        if not isinstance(payload, dict):
+            raise DecodeError("Invalid payload string: must be a json object")
+        return payload
+
+
+# Instance PyJWT réutilisée pour le décodage, évitant le passage par le
+# wrapper de module ``jwt.decode``. La vérification HMAC de PyJWT
+# compare les signatures via ``hmac.compare_digest`` (temps constant).
+_jwt = _OrjsonPyJWT()
+
+
+def _b64url(data: bytes) -> bytes:
+    """Encoder en base64url sans remplissage (RFC 7515)."""
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+# Segment d'en-tête JOSE, identique pour tous les tokens, encodé une
+# seule fois (mêmes octets que l'en-tête produit par PyJWT).
+_JWT_HEADER_SEGMENT = _b64url(orjson.dumps({"alg": ALGORITHM, "typ": "JWT"}))
+
+# Contexte HMAC-SHA256 initialisé une seule fois avec la clé secrète :
+# chaque signature part d'une copie de ce contexte, sans repréparer la
+# clé (``prepare_key`` de PyJWT) ni recalculer les blocs ipad/opad.
+_SIGNING_HMAC = hmac.new(SECRET_KEY_BYTES, digestmod=hashlib.sha256)
+
+
+def _sign_token(payload: dict) -> str:
+    """
+    Sérialiser et signer un token JWT HS256 (JWS compact).
 
     Args:
-        password (str): Mot de passe en clair à hacher.
+        payload (dict): Claims du token, sérialisables par ``orjson``.
 
     Returns:
-        str: Hash bcrypt du mot de passe, prêt à être stocké en base
-            de données.
+        str: Token ``en-tête.payload.signature`` encodé en base64url.
     """
-    return pwd_context.hash(password)
+    signing_input = _JWT_HEADER_SEGMENT + b"." + _b64url(orjson.dumps(payload))
+    mac = _SIGNING_HMAC.copy()
+    mac.update(signing_input)
+    return (signing_input + b"." + _b64url(mac.digest())).decode("ascii")
 
 
+# Schéma OAuth2 « Bearer token » utilisé par FastAPI pour extraire
+# automatiquement le token JWT depuis l'en-tête ``Authorization``.
+# Le paramètre ``tokenUrl`` indique l'endpoint de connexion pour la
+# documentation interactive Swagger UI.
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/v1/account/login")
+
+# Cache LRU borné des vérifications bcrypt réussies. Les clés sont des
+# empreintes HMAC-SHA256 du couple (mot de passe, hash) poivrées avec
+# la clé secrète : aucun mot de passe en clair n'est conservé en
+# mémoire. Seuls les succès sont mémorisés, un échec repasse toujours
+# par bcrypt.
+_verify_cache: LRUCache = LRUCache(maxsize=4096)
+_verify_cache_lock = threading.Lock()
+_verify_pepper = SECRET_KEY_BYTES
+
+# Préfixes des identifiants bcrypt reconnus et longueur fixe d'un hash
+# bcrypt encodé (``$2b$12$`` + 22 caractères de sel + 31 de condensat).
+BCRYPT_PREFIXES = ("$2a$", "$2b$", "$2y$")
+BCRYPT_HASH_LENGTH = 60
+
+# Cache TTL des payloads JWT déjà vérifiés, indexé par une empreinte
+# BLAKE2b (16 octets) du token. Chaque entrée conserve également la
+# date d'expiration du token afin de ne jamais servir un payload
+# au-delà de son claim ``exp``, même si le TTL du cache est plus long.
+_token_cache: TTLCache = TTLCache(maxsize=8192, ttl=60)
+_token_cache_lock = threading.Lock()
+
+# Cache TTL court des utilisateurs authentifiés, indexé par nom
+# d'utilisateur. Il ne conserve qu'un instantané des colonnes de la
+# table ``users`` (jamais l'instance ORM attachée à une session) ; une
+# instance ``User`` détachée est reconstruite à chaque lecture. La durée
+# de vie est fixée par ``settings.USER_CACHE_TTL`` (``0`` le désactive).
+_user_cache: TTLCache = TTLCache(maxsize=10_000, ttl=max(settings.USER_CACHE_TTL, 1))
+_user_cache_lock = threading.Lock()
+_USER_COLUMNS = tuple(column.key for column in database.User.__table__.columns)
+
+# ================== PASSWORD ==================
 def verify_password(plain: str, hashed: str) -> bool:
     """
     Vérifier qu'un mot de passe en clair correspond à un hash bcrypt.
@@ -97,6 +188,16 @@ def verify_password(plain: str, hashed: str) -> bool:
     en base de données. La comparaison est effectuée en temps constant
     pour prévenir les attaques par analyse temporelle (timing attacks).
 
+    Lorsque ``settings.AUTH_VERIFY_CACHE`` est actif, une empreinte
+    HMAC-SHA256 du couple (mot de passe, hash) est d'abord recherchée
+    dans un cache LRU borné : une vérification déjà réussie évite ainsi
+    de relancer bcrypt. Un changement de mot de passe modifie le hash
+    et invalide donc naturellement l'entrée correspondante.
+
+    Un hash qui n'a manifestement pas le format bcrypt (valeur vide,
+    ligne héritée, préfixe inconnu) est rejeté immédiatement, sans
+    exécuter la dérivation de clé.
+
     Args:
         plain (str): Mot de passe en clair soumis par l'utilisateur.
         hashed (str): Hash bcrypt stocké en base de données.
@@ -105,11 +206,63 @@ def verify_password(plain: str, hashed: str) -> bool:
         bool: ``True`` si le mot de passe correspond au hash,
             ``False`` sinon.
     """
-    return pwd_context.verify(plain, hashed)
+    if not (
+        hashed
+        and len(hashed) == BCRYPT_HASH_LENGTH
+        and hashed.startswith(BCRYPT_PREFIXES)
+    ):
+        return False
+
+    if not settings.AUTH_VERIFY_CACHE:
+        return security.verify_password(plain, hashed)
+
+    key = hmac.new(
+        _verify_pepper,
+        plain.encode("utf-8") + b"|" + hashed.encode("utf-8"),
+        hashlib.sha256,
+    ).digest()
+
+    with _verify_cache_lock:
+        if _verify_cache.get(key):
+            return True
+
+    if not security.verify_password(plain, hashed):
+        return False
+
+    with _verify_cache_lock:
+        _verify_cache[key] = True
+    return True
+
+
+@lru_cache(maxsize=1)
+def _dummy_hash() -> str:
+    """Retourner un hash bcrypt de référence, calculé au premier appel."""
+    return security.get_password_hash("snaptaplaque-dummy-password")
+
+
+def dummy_verify_password(plain: str) -> bool:
+    """
+    Simuler une vérification bcrypt pour un utilisateur inexistant.
+
+    Exécute une vérification complète contre un hash de référence
+    généré avec le même facteur de coût que les hashs réels. Appelée
+    lorsque le nom d'utilisateur est inconnu, elle aligne le temps de
+    réponse sur celui d'un mot de passe erroné et empêche ainsi
+    l'énumération des comptes par analyse temporelle.
+
+    Args:
+        plain (str): Mot de passe en clair soumis par l'utilisateur.
+
+    Returns:
+        bool: Toujours ``False``.
+    """
+    security.verify_password(plain, _dummy_hash())
+    return False
 
 # ================== JWT ==================
 def create_access_token(
     data: dict,
+    expires_delta: Optional[timedelta] = None,
 ) -> str:
     """
     Générer un token JWT signé.
@@ -123,16 +276,17 @@ def create_access_token(
             du token. Doit contenir au minimum la clé ``"sub"`` avec
             le nom d'utilisateur.
         expires_delta (Optional[timedelta]): Durée de validité du token.
-            Si ``None``, une durée par défaut de 15 minutes est appliquée.
+            Si ``None``, la durée par défaut ``DEFAULT_TTL`` (dérivée de
+            ``ACCESS_TOKEN_EXPIRE_MINUTES``) est appliquée.
 
     Returns:
         str: Token JWT encodé sous forme de chaîne de caractères,
             prêt à être transmis au client.
     """
     to_encode = data.copy()
-    expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    ttl = int(expires_delta.total_seconds()) if expires_delta else DEFAULT_TTL
+    to_encode["exp"] = int(time.time()) + ttl
+    return _sign_token(to_encode)
 
 
 def decode_access_token(token: str) -> dict:
@@ -144,6 +298,19 @@ def decode_access_token(token: str) -> dict:
     En cas d'échec (signature invalide, token expiré, format incorrect),
     une exception HTTP 401 est levée.
 
+    Les payloads déjà vérifiés sont conservés dans un cache TTL indexé
+    par l'empreinte BLAKE2b du token : un même token présenté plusieurs
+    fois évite ainsi de recalculer la signature HMAC. Une entrée n'est
+    jamais servie au-delà du claim ``exp`` du token.
+
+    En cas d'absence dans le cache, la validation procède par étapes de
+    coût croissant et s'interrompt dès le premier échec :
+        1. **En-tête** — l'algorithme annoncé doit être ``ALGORITHM``.
+        2. **Expiration** — le claim ``exp`` est lu sans vérification
+           de signature ; un token expiré est rejeté sans calcul HMAC.
+        3. **Signature** — vérification HMAC complète, avec présence
+           obligatoire des claims ``exp`` et ``sub``.
+
     Args:
         token (str): Token JWT encodé à décoder.
 
@@ -155,13 +322,91 @@ def decode_access_token(token: str) -> dict:
         HTTPException (401): Si le token est invalide, expiré ou si
             sa signature ne peut pas être vérifiée.
     """
+    key = hashlib.blake2b(token.encode("utf-8"), digest_size=16).digest()
+    now = time.time()
+
+    with _token_cache_lock:
+        cached = _token_cache.get(key)
+    if cached is not None and cached[1] > now:
+        return cached[0]
+
+    invalid_token = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Token invalide ou expiré",
+    )
+
     try:
-        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-    except JWTError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token invalide ou expiré",
+        # 1. En-tête : rejet immédiat d'un algorithme inattendu.
+        if jwt.get_unverified_header(token).get("alg") != ALGORITHM:
+            raise invalid_token
+
+        # 2. Expiration : lecture du payload sans vérification HMAC.
+        unverified = _jwt.decode(token, options={"verify_signature": False})
+        exp = unverified.get("exp")
+        if not isinstance(exp, (int, float)) or exp <= now:
+            raise invalid_token
+
+        # 3. Signature : vérification complète du token.
+        payload = _jwt.decode(
+            token,
+            SECRET_KEY_BYTES,
+            algorithms=[ALGORITHM],
+            options={"require": ["exp", "sub"]},
         )
+    except InvalidTokenError:
+        raise invalid_token
+
+    with _token_cache_lock:
+        _token_cache[key] = (payload, payload.get("exp", now))
+    return payload
+
+# ================== CACHE UTILISATEURS ==================
+def _load_user(db: Session, username: str) -> database.User | None:
+    """
+    Charger un utilisateur en passant par le cache TTL.
+
+    En cas de succès de cache, une instance ``User`` transitoire est
+    reconstruite à partir de l'instantané des colonnes, sans requête
+    SQL. Sinon, l'utilisateur est chargé via ``crud`` et son instantané
+    est mémorisé pour les requêtes suivantes.
+
+    Args:
+        db (Session): Session SQLAlchemy active.
+        username (str): Nom d'utilisateur extrait du token.
+
+    Returns:
+        database.User | None: Utilisateur trouvé, ou ``None``.
+    """
+    if settings.USER_CACHE_TTL <= 0:
+        return crud.get_user_by_username(db, username)
+
+    with _user_cache_lock:
+        snapshot = _user_cache.get(username)
+    if snapshot is not None:
+        return database.User(**snapshot)
+
+    user = crud.get_user_by_username(db, username)
+    if user is not None:
+        snapshot = {key: getattr(user, key) for key in _USER_COLUMNS}
+        with _user_cache_lock:
+            _user_cache[username] = snapshot
+    return user
+
+
+def invalidate_cached_user(username: str) -> None:
+    """
+    Retirer un utilisateur du cache d'authentification.
+
+    À appeler après toute modification ou suppression d'un compte
+    (suppression RGPD, désactivation, changement de mot de passe) pour
+    que la requête suivante relise l'état à jour en base.
+
+    Args:
+        username (str): Nom d'utilisateur à invalider.
+    """
+    with _user_cache_lock:
+        _user_cache.pop(username, None)
+
 
 # ================== DEPENDANCES ==================
 def get_current_user(
@@ -174,7 +419,9 @@ def get_current_user(
     Dépendance FastAPI qui décode le token Bearer présent dans l'en-tête
     ``Authorization`` de la requête, extrait le nom d'utilisateur du
     claim ``sub``, puis charge l'utilisateur correspondant depuis la
-    base de données.
+    base de données, ou depuis un cache TTL (durée de vie
+    ``settings.USER_CACHE_TTL``, ``0`` le désactive) lorsqu'il a été
+    chargé récemment.
 
     Cette dépendance est utilisée en amont de ``get_current_active_user``
     et peut être injectée directement dans les endpoints nécessitant
@@ -200,7 +447,7 @@ def get_current_user(
     if username is None:
         raise HTTPException(status_code=401, detail="Token invalide")
 
-    user = crud.get_user_by_username(db, username)
+    user = _load_user(db, username)
     if not user:
         raise HTTPException(status_code=401, detail="Utilisateur non trouvé")
 
@@ -208,31 +455,42 @@ def get_current_user(
 
 
 def get_current_active_user(
-    current_user: database.User = Depends(get_current_user),
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
 ) -> database.User:
     """
     Vérifier que l'utilisateur authentifié possède un compte actif.
 
-    Dépendance FastAPI qui s'appuie sur ``get_current_user`` pour obtenir
+    Dépendance FastAPI qui reçoit directement le token et la session,
+    appelle ``get_current_user`` comme une simple fonction pour obtenir
     l'utilisateur courant, puis vérifie que son compte n'a pas été
     désactivé (``is_active=True``). Si le compte est désactivé, une
     erreur HTTP 403 est levée.
 
+    L'appel direct (plutôt qu'un ``Depends(get_current_user)``) retire
+    un niveau du graphe de dépendances que FastAPI résout à chaque
+    requête, pour un comportement identique.
+
     Cette dépendance est la plus couramment utilisée dans les endpoints
     protégés de l'application pour garantir à la fois l'authentification
     et l'activation du compte.
 
     Args:
-        current_user (database.User): Utilisateur authentifié, injecté
-            automatiquement par la dépendance ``get_current_user``.
+        token (str): Token JWT extrait automatiquement de l'en-tête
+            ``Authorization: Bearer <token>`` par le schéma OAuth2.
+        db (Session): Session SQLAlchemy injectée automatiquement par
+            la dépendance ``get_db``.
 
     Returns:
         database.User: Instance ORM de l'utilisateur authentifié et actif.
 
     Raises:
+        HTTPException (401): Si le token est invalide ou si l'utilisateur
+            n'existe pas (voir ``get_current_user``).
         HTTPException (403): Si le compte de l'utilisateur est désactivé
             (``is_active=False``).
     """
+    current_user = get_current_user(token, db)
     if not current_user.is_active:
         raise HTTPException(status_code=403, detail="Compte désactivé")
     return current_user
@@ -0,0 +1,252 @@
+"""
+batch_queue.py — File de micro-batching des inférences de l'API SnapTaPlaque.
+
+Sous charge concurrente, chaque requête de prédiction exécutait le
+pipeline de reconnaissance sur une seule image. Ce module regroupe les
+requêtes arrivant simultanément en un unique appel au modèle, libéré
+dès que la taille maximale du lot est atteinte ou que le délai
+d'attente maximal est écoulé : le premier élément d'un lot n'attend
+jamais plus de ``max_wait_time`` secondes.
+
+Un second étage optionnel (``finalizer``) permet de chaîner deux
+traitements exécutés dans des exécuteurs distincts : pendant que le
+second étage traite le lot N, le premier traite déjà le lot N + 1.
+
+Composants exposés :
+    - ``AsyncBatchQueue`` — File asynchrone regroupant les éléments
+      soumis via ``add_request`` et les traitant par lots dans un
+      exécuteur dédié.
+
+Exemple d'utilisation ::
+
+    queue = AsyncBatchQueue(pipeline.detect_batch, max_batch_size=8,
+                            max_wait_time=0.005, executor=detect_executor,
+                            finalizer=pipeline.read_batch,
+                            finalizer_executor=ocr_executor)
+    await queue.start()
+    result = await queue.add_request(image)
+    await queue.stop()
+
+Version : 1.0.0
+"""
+
+import asyncio
+import logging
+from concurrent.futures import Executor
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncBatchQueue:
+    """
+    File asynchrone de regroupement des requêtes par lots.
+
+    Une tâche de fond (``_process_loop``) attend le premier élément de
+    la file, complète le lot avec les éléments arrivés pendant
+    ``max_wait_time`` secondes (dans la limite de ``max_batch_size``),
+    puis exécute ``handler`` sur le lot dans ``executor``. Chaque
+    appelant reçoit le résultat correspondant à son élément.
+
+    Attributes:
+        handler (Callable[[list], list]): Fonction synchrone traitant
+            une liste d'éléments et retournant une liste de résultats
+            de même longueur, dans le même ordre.
+        max_batch_size (int): Nombre maximal d'éléments par lot.
+        max_wait_time (float): Délai maximal, en secondes, d'attente
+            d'éléments supplémentaires après le premier élément du lot.
+        executor (Optional[Executor]): Exécuteur dans lequel ``handler``
+            est appelé. ``None`` utilise l'exécuteur par défaut de la
+            boucle d'événements.
+        finalizer (Optional[Callable[[list], list]]): Second étage
+            optionnel, appelé sur la liste retournée par ``handler`` ;
+            son résultat est réparti entre les appelants. Exécuté en
+            tâche de fond : la collecte et le traitement du lot suivant
+            par ``handler`` n'attendent pas sa fin.
+        finalizer_executor (Optional[Executor]): Exécuteur dans lequel
+            ``finalizer`` est appelé.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[list], list],
+        max_batch_size: int,
+        max_wait_time: float,
+        executor: Optional[Executor] = None,
+        finalizer: Optional[Callable[[list], list]] = None,
+        finalizer_executor: Optional[Executor] = None,
+    ):
+        self.handler = handler
+        self.max_batch_size = max(max_batch_size, 1)
+        self.max_wait_time = max(max_wait_time, 0.0)
+        self.executor = executor
+        self.finalizer = finalizer
+        self.finalizer_executor = finalizer_executor
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        # Lots en cours de traitement par ``finalizer``.
+        self._finalizing: set = set()
+
+    def is_running(self) -> bool:
+        """
+        Vérifier si la tâche de traitement des lots est active.
+
+        Returns:
+            bool: ``True`` si ``start`` a été appelé et que la tâche de
+                fond n'est pas terminée.
+        """
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        """
+        Démarrer la tâche de traitement des lots.
+
+        Doit être appelé depuis la boucle d'événements de l'application
+        (gestionnaire ``lifespan``). Sans effet si la tâche est déjà
+        active.
+        """
+        if self.is_running():
+            return
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._process_loop())
+
+    async def stop(self) -> None:
+        """
+        Arrêter la tâche de traitement des lots.
+
+        Les requêtes encore en attente dans la file, ou en cours de
+        traitement par ``finalizer``, sont annulées.
+        """
+        if self._task is None:
+            return
+        for task in (self._task, *self._finalizing):
+            task.cancel()
+        await asyncio.gather(self._task, *self._finalizing, return_exceptions=True)
+        self._task = None
+
+        while not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            future.cancel()
+
+    async def add_request(self, item: Any) -> Any:
+        """
+        Soumettre un élément et attendre le résultat de son lot.
+
+        Args:
+            item (Any): Élément à traiter (image décodée).
+
+        Returns:
+            Any: Résultat retourné pour cet élément par ``finalizer``
+                s'il est défini, sinon par ``handler``.
+
+        Raises:
+            RuntimeError: Si la file n'a pas été démarrée.
+            Exception: Toute exception levée par ``handler`` ou
+                ``finalizer`` lors du traitement du lot contenant
+                l'élément.
+        """
+        if not self.is_running():
+            raise RuntimeError("File de traitement par lots non démarrée")
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    async def _collect_batch(self) -> list:
+        """
+        Attendre le premier élément puis compléter le lot.
+
+        Returns:
+            list: Couples ``(élément, future)`` composant le lot.
+        """
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait_time
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run_stage(self, batch: list, function: Callable[[list], list],
+                         executor: Optional[Executor], items: list) -> Optional[list]:
+        """
+        Exécuter un étage de traitement sur un lot.
+
+        Args:
+            batch (list): Couples ``(élément, future)`` du lot.
+            function (Callable[[list], list]): Traitement de l'étage.
+            executor (Optional[Executor]): Exécuteur de l'étage.
+            items (list): Entrées de l'étage, une par élément du lot.
+
+        Returns:
+            Optional[list]: Sorties de l'étage, ou ``None`` si le
+                traitement a échoué ; l'exception est alors propagée à
+                toutes les requêtes du lot.
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(executor, function, items)
+        except asyncio.CancelledError:
+            # Arrêt de la file pendant le traitement (``stop``).
+            for _, future in batch:
+                future.cancel()
+            raise
+        except Exception as exc:
+            logger.error("❌ Erreur lors du traitement d'un lot de %d éléments: %s", len(items), exc)
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return None
+
+    @staticmethod
+    def _resolve(batch: list, results: list) -> None:
+        """
+        Transmettre à chaque appelant le résultat de son élément.
+        """
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def _finalize(self, batch: list, intermediate: list) -> None:
+        """
+        Exécuter ``finalizer`` sur un lot puis répartir les résultats.
+        """
+        results = await self._run_stage(batch, self.finalizer, self.finalizer_executor, intermediate)
+        if results is not None:
+            self._resolve(batch, results)
+
+    async def _process_loop(self) -> None:
+        """
+        Boucle de fond : collecter un lot, le traiter, répartir les résultats.
+
+        Les requêtes dont l'appelant a abandonné l'attente (client
+        déconnecté) sont écartées avant l'inférence. Une erreur d'un
+        étage est propagée à toutes les requêtes du lot sans
+        interrompre la boucle. Si ``finalizer`` est défini, le second
+        étage est lancé en tâche de fond et la boucle passe
+        immédiatement au lot suivant.
+        """
+        while True:
+            batch = await self._collect_batch()
+            batch = [(item, future) for item, future in batch if not future.done()]
+            if not batch:
+                continue
+
+            items = [item for item, _ in batch]
+            results = await self._run_stage(batch, self.handler, self.executor, items)
+            if results is None:
+                continue
+
+            if self.finalizer is None:
+                self._resolve(batch, results)
+                continue
+
+            task = asyncio.create_task(self._finalize(batch, results))
+            self._finalizing.add(task)
+            task.add_done_callback(self._finalizing.discard)
@@ -15,12 +15,16 @@ Fonctions exposées :
       de données avec hachage du mot de passe.
     - ``create_prediction``        — Enregistre une nouvelle prédiction
       associée à un utilisateur.
+    - ``create_predictions``       — Enregistre plusieurs prédictions
+      d'un utilisateur en une insertion groupée.
     - ``get_user_predictions``     — Récupère la liste paginée des
       prédictions d'un utilisateur.
+    - ``get_user_prediction_history`` — Récupère une page de l'historique
+      d'un utilisateur, limitée aux colonnes affichées.
     - ``get_user_prediction_stats``— Retourne les statistiques de
       prédiction d'un utilisateur (nombre total).
-    - ``get_all_users``            — Récupère la liste complète des
-      utilisateurs enregistrés.
+    - ``get_all_users``            — Récupère les informations publiques
+      de tous les utilisateurs enregistrés.
     - ``get_global_stats``         — Retourne les statistiques globales
       de la plateforme (nombre d'utilisateurs et de prédictions).
     - ``get_vehicle_by_license_plate`` — Recherche les informations d'un
@@ -29,13 +33,56 @@ Fonctions exposées :
 Version : 1.0.0
 """
 
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy.orm import Session, raiseload
+from sqlalchemy import bindparam, func, insert, select, text, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from app.database import User, Prediction, Vehicle, user_favorites
 from app.schemas import UserCreate
 from app.security import get_password_hash
 
 from datetime import datetime
+from typing import Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# ================== REQUÊTES PRÉCONSTRUITES ==================
+
+# Instructions construites une seule fois à l'import pour les requêtes
+# les plus fréquentes (authentification, statistiques). Les valeurs
+# sont transmises via des ``bindparam`` à l'exécution : l'arbre
+# d'expression n'est plus reconstruit à chaque appel et la clé du cache
+# de compilation SQLAlchemy est calculée sur un objet stable.
+_USER_BY_USERNAME = select(User).where(User.username == bindparam("username"))
+_USER_BY_EMAIL = select(User).where(User.email == bindparam("email"))
+_USER_PREDICTION_COUNT = (
+    select(func.count())
+    .select_from(Prediction)
+    .where(Prediction.user_id == bindparam("user_id"))
+)
+_GLOBAL_COUNTS = select(
+    select(func.count()).select_from(User).scalar_subquery().label("total_users"),
+    select(func.count()).select_from(Prediction).scalar_subquery().label("total_predictions"),
+)
+# Colonnes publiques des utilisateurs (schéma ``UserResponse``), sans
+# le mot de passe haché ni les relations.
+_ALL_USERS = select(
+    User.id,
+    User.email,
+    User.username,
+    User.full_name,
+    User.is_active,
+    User.is_admin,
+    User.created_at,
+).order_by(User.id)
+# Estimations PostgreSQL du nombre de lignes (``pg_class.reltuples``),
+# maintenues par VACUUM / ANALYZE : lecture instantanée quelle que soit
+# la taille des tables. Vaut ``-1`` pour une table jamais analysée.
+_GLOBAL_ESTIMATES = text(
+    "SELECT"
+    " (SELECT reltuples::bigint FROM pg_class WHERE oid = 'users'::regclass) AS total_users,"
+    " (SELECT reltuples::bigint FROM pg_class WHERE oid = 'predictions'::regclass) AS total_predictions"
+)
 
 
 def get_user_by_email(db: Session, email: str) -> User:
@@ -54,7 +101,7 @@ def get_user_by_email(db: Session, email: str) -> User:
         User: Instance ORM de l'utilisateur trouvé, ou ``None`` si
             aucun utilisateur ne correspond à l'email fourni.
     """
-    return db.query(User).filter(User.email == email).first()
+    return db.execute(_USER_BY_EMAIL, {"email": email}).scalars().first()
 
 
 def get_user_by_username(db: Session, username: str) -> User:
@@ -73,16 +120,22 @@ def get_user_by_username(db: Session, username: str) -> User:
         User: Instance ORM de l'utilisateur trouvé, ou ``None`` si
             aucun utilisateur ne correspond au nom fourni.
     """
-    return db.query(User).filter(User.username == username).first()
+    return db.execute(_USER_BY_USERNAME, {"username": username}).scalars().first()
 
 
-def create_user(db: Session, user: UserCreate) -> User:
+def create_user(db: Session, user: UserCreate) -> Optional[User]:
     """
     Créer un nouvel utilisateur en base de données avec traçabilité du consentement RGPD.
 
     Hache le mot de passe en clair fourni par l'utilisateur via bcrypt,
-    instancie un objet ORM ``User`` avec les informations du schéma
-    ``UserCreate``, puis persiste l'enregistrement en base de données.
+    puis insère l'enregistrement en base avec les informations du schéma
+    ``UserCreate``.
+
+    L'unicité de l'adresse email et du nom d'utilisateur est garantie
+    par la base elle-même : l'insertion est émise sous la forme
+    ``INSERT ... ON CONFLICT DO NOTHING RETURNING``. En cas de doublon,
+    aucune ligne n'est insérée ni retournée, sans ``IntegrityError`` et
+    sans situation de concurrence entre deux inscriptions simultanées.
 
     Conformité RGPD (Art. 6.1.a & Art. 7) :
         Si l'utilisateur a coché la case de consentement lors de
@@ -108,32 +161,34 @@ def create_user(db: Session, user: UserCreate) -> User:
             - ``gdpr_consent`` (bool) : Consentement RGPD explicite.
 
     Returns:
-        User: Instance ORM de l'utilisateur nouvellement créé, avec
-            tous les champs rafraîchis depuis la base de données
-            (y compris ``id`` auto-incrémenté et ``created_at``).
+        User | None: Instance ORM de l'utilisateur nouvellement créé,
+            avec tous ses champs renseignés depuis la clause
+            ``RETURNING`` (y compris ``id`` auto-incrémenté et
+            ``created_at``), ou ``None`` si l'adresse email ou le nom
+            d'utilisateur est déjà enregistré.
     """
     # Hachage du mot de passe en clair via bcrypt avant stockage.
     # Le mot de passe en clair n'est jamais persisté en base de données
     # (conformité RGPD Art. 32 — sécurité du traitement).
     hashed_password = get_password_hash(user.password)
 
-    # Construction de l'instance ORM User. Le champ gdpr_consent_at
+    # Insertion atomique en un aller-retour. Le champ gdpr_consent_at
     # horodate le consentement RGPD à l'instant UTC de l'inscription.
-    db_user = User(
-        email=user.email,
-        username=user.username,
-        hashed_password=hashed_password,
-        full_name=user.full_name,
-        is_admin=user.is_admin,
-        gdpr_consent_at=datetime.utcnow() if user.gdpr_consent else None,
+    stmt = (
+        pg_insert(User)
+        .values(
+            email=user.email,
+            username=user.username,
+            hashed_password=hashed_password,
+            full_name=user.full_name,
+            is_admin=user.is_admin,
+            gdpr_consent_at=datetime.utcnow() if user.gdpr_consent else None,
+        )
+        .on_conflict_do_nothing()
+        .returning(User)
     )
-
-    # Persistance en base : ajout, validation de la transaction et
-    # rafraîchissement de l'instance pour récupérer les valeurs
-    # générées côté serveur (id, created_at).
-    db.add(db_user)
+    db_user = db.scalars(stmt).first()
     db.commit()
-    db.refresh(db_user)
     return db_user
 
 
@@ -149,8 +204,10 @@ def create_prediction(
 
     Crée un enregistrement dans la table ``predictions`` associant les
     résultats d'une reconnaissance de plaque à l'utilisateur ayant
-    soumis l'image. L'instance ORM est rafraîchie après le commit pour
-    inclure les champs générés par la base (``id``, ``created_at``, etc.).
+    soumis l'image. L'``id`` est obtenu lors du flush (RETURNING) et les
+    autres valeurs par défaut sont calculées côté Python : l'instance,
+    non expirée au commit (voir ``SessionLocal``), est retournée
+    complète sans SELECT de rechargement.
 
     Args:
         db (Session): Session SQLAlchemy active.
@@ -172,17 +229,93 @@ def create_prediction(
     )
     db.add(db_prediction)
     db.commit()
-    db.refresh(db_prediction)
     return db_prediction
 
 
-def get_user_predictions(db: Session, user_id: int, skip: int = 0, limit: int = 100):
+def create_predictions(db: Session, user_id: int, items: list[dict]) -> None:
+    """
+    Enregistrer plusieurs prédictions en une seule insertion groupée.
+
+    Variante de ``create_prediction`` destinée aux traitements par lot
+    (plusieurs images soumises ensemble, imports). Les lignes sont
+    insérées via un ``INSERT`` ORM groupé : avec psycopg2, SQLAlchemy
+    les regroupe en ``INSERT ... VALUES (...), (...)`` multi-lignes au
+    lieu d'un aller-retour par prédiction, puis une seule transaction
+    est validée.
+
+    Args:
+        db (Session): Session SQLAlchemy active.
+        user_id (int): Identifiant de l'utilisateur propriétaire des
+            prédictions.
+        items (list[dict]): Prédictions à enregistrer, chacune sous la
+            forme ``{"filename": str, "results": list}``.
+    """
+    if not items:
+        return
+
+    db.execute(insert(Prediction), [{"user_id": user_id, **item} for item in items])
+    db.commit()
+
+
+def _paginate_user_predictions(
+    stmt,
+    user_id: int,
+    skip: int,
+    limit: int,
+    after_created_at: Optional[datetime],
+    after_id: Optional[int],
+):
+    """
+    Restreindre une requête aux prédictions d'un utilisateur et la paginer.
+
+    Applique le filtre sur l'utilisateur, le curseur éventuel, le tri
+    de la plus récente à la plus ancienne puis ``OFFSET`` / ``LIMIT``
+    (voir ``get_user_predictions`` pour les modes de pagination).
+
+    Returns:
+        Select: Requête filtrée, triée et paginée.
+    """
+    stmt = stmt.where(Prediction.user_id == user_id)
+    if after_created_at is not None and after_id is not None:
+        stmt = stmt.where(
+            tuple_(Prediction.created_at, Prediction.id) < (after_created_at, after_id)
+        )
+    return (
+        stmt
+        .order_by(Prediction.created_at.desc(), Prediction.id.desc())
+        .offset(skip)
+        .limit(limit)
+    )
+
+
+def get_user_predictions(
+    db: Session,
+    user_id: int,
+    skip: int = 0,
+    limit: int = 100,
+    after_created_at: Optional[datetime] = None,
+    after_id: Optional[int] = None,
+):
     """
     Récupérer la liste paginée des prédictions d'un utilisateur.
 
     Effectue une requête sur la table ``predictions`` filtrée par
-    l'identifiant de l'utilisateur, avec support de la pagination via
-    les paramètres ``skip`` (offset) et ``limit``.
+    l'identifiant de l'utilisateur. Les prédictions sont triées de la
+    plus récente à la plus ancienne (``created_at`` puis ``id``), ordre
+    fourni par l'index ``idx_user_created``.
+
+    Deux modes de pagination sont supportés :
+        - **Curseur (keyset)** — Si ``after_created_at`` et ``after_id``
+          sont fournis, seules les prédictions strictement antérieures
+          à ce couple sont retournées. Le coût de la requête est alors
+          indépendant de la profondeur de la page.
+        - **Offset** — ``skip`` enregistrements sont ignorés en début
+          de résultat. PostgreSQL doit parcourir puis écarter ces
+          lignes : à réserver aux premières pages.
+
+    Aucune relation n'est chargée : tout accès à ``Prediction.user``
+    sur les instances retournées lève une erreur (``raiseload``) au lieu
+    de déclencher une requête SQL par prédiction.
 
     Args:
         db (Session): Session SQLAlchemy active.
@@ -192,12 +325,62 @@ def get_user_predictions(db: Session, user_id: int, skip: int = 0, limit: int =
             résultat (offset). Par défaut ``0``.
         limit (int): Nombre maximal d'enregistrements à retourner.
             Par défaut ``100``.
+        after_created_at (datetime | None): Date de création de la
+            dernière prédiction de la page précédente. Par défaut
+            ``None``.
+        after_id (int | None): Identifiant de la dernière prédiction de
+            la page précédente. Par défaut ``None``.
 
     Returns:
         list[Prediction]: Liste des instances ORM ``Prediction``
             correspondant aux critères de recherche.
     """
-    return db.query(Prediction).filter(Prediction.user_id == user_id).offset(skip).limit(limit).all()
+    stmt = select(Prediction).options(raiseload("*"))
+    return db.scalars(
+        _paginate_user_predictions(stmt, user_id, skip, limit, after_created_at, after_id)
+    ).all()
+
+
+def get_user_prediction_history(
+    db: Session,
+    user_id: int,
+    skip: int = 0,
+    limit: int = 100,
+    after_created_at: Optional[datetime] = None,
+    after_id: Optional[int] = None,
+):
+    """
+    Récupérer une page de l'historique des prédictions d'un utilisateur.
+
+    Variante de ``get_user_predictions`` destinée à l'endpoint
+    d'historique : seules les colonnes affichées (``id``,
+    ``created_at``, ``results``) sont lues, sans construction
+    d'instances ORM ni passage par l'identity map de la session. La
+    pagination, identique, porte sur les prédictions, ce qui garde le
+    curseur ``(created_at, id)`` exact lorsqu'une prédiction contient
+    plusieurs plaques.
+
+    Args:
+        db (Session): Session SQLAlchemy active.
+        user_id (int): Identifiant de l'utilisateur.
+        skip (int): Nombre d'enregistrements à ignorer en début de
+            résultat (offset). Par défaut ``0``.
+        limit (int): Nombre maximal d'enregistrements à retourner.
+            Par défaut ``100``.
+        after_created_at (datetime | None): Date de création de la
+            dernière prédiction de la page précédente. Par défaut
+            ``None``.
+        after_id (int | None): Identifiant de la dernière prédiction de
+            la page précédente. Par défaut ``None``.
+
+    Returns:
+        list[Row]: Lignes exposant les attributs ``id``, ``created_at``
+            et ``results``.
+    """
+    stmt = select(Prediction.id, Prediction.created_at, Prediction.results)
+    return db.execute(
+        _paginate_user_predictions(stmt, user_id, skip, limit, after_created_at, after_id)
+    ).all()
 
 
 def get_user_prediction_stats(db: Session, user_id: int):
@@ -205,7 +388,10 @@ def get_user_prediction_stats(db: Session, user_id: int):
     Calculer les statistiques de prédiction d'un utilisateur.
 
     Compte le nombre total de prédictions enregistrées en base de
-    données pour l'utilisateur spécifié.
+    données pour l'utilisateur spécifié. La requête émise est un
+    ``SELECT count(*)`` à plat, sans la sous-requête ajoutée par
+    ``Query.count()``, que PostgreSQL peut résoudre par un parcours
+    d'index seul sur ``idx_user_created``.
 
     Args:
         db (Session): Session SQLAlchemy active.
@@ -216,39 +402,52 @@ def get_user_prediction_stats(db: Session, user_id: int):
         dict: Dictionnaire contenant la clé ``total_predictions`` (int)
             indiquant le nombre total de prédictions de l'utilisateur.
     """
-    total = db.query(Prediction).filter(Prediction.user_id == user_id).count()
+    total = db.execute(_USER_PREDICTION_COUNT, {"user_id": user_id}).scalar() or 0
     return {"total_predictions": total}
 
 
-def get_all_users(db: Session):
+def get_all_users(db: Session) -> list[dict]:
     """
-    Récupérer la liste complète des utilisateurs enregistrés.
+    Récupérer les informations publiques de tous les utilisateurs.
 
-    Effectue une requête sans filtre sur la table ``users`` et retourne
-    l'ensemble des enregistrements. Cette fonction est principalement
-    destinée aux endpoints d'administration.
+    Effectue une requête sans filtre sur la table ``users``, limitée aux
+    colonnes du schéma ``UserResponse``. Les lignes sont retournées sous
+    forme de dictionnaires, sans instanciation d'objets ORM ni de
+    modèles Pydantic : la liste peut être sérialisée directement en
+    JSON. Cette fonction est principalement destinée aux endpoints
+    d'administration.
 
     Args:
         db (Session): Session SQLAlchemy active.
 
     Returns:
-        list[User]: Liste de toutes les instances ORM ``User``
-            présentes en base de données.
+        list[dict]: Un dictionnaire par utilisateur (``id``, ``email``,
+            ``username``, ``full_name``, ``is_active``, ``is_admin``,
+            ``created_at``), par identifiant croissant.
     """
-    return db.query(User).all()
+    return [dict(row) for row in db.execute(_ALL_USERS).mappings()]
 
 
-def get_global_stats(db: Session) -> dict:
+def get_global_stats(db: Session, approximate: bool = False) -> dict:
     """
     Calculer les statistiques globales de la plateforme.
 
     Agrège le nombre total d'utilisateurs et de prédictions enregistrés
-    en base de données à l'aide de la fonction SQL ``COUNT``. Cette
+    en base de données à l'aide de la fonction SQL ``COUNT(*)``. Les
+    deux comptages sont émis sous forme de sous-requêtes scalaires d'un
+    unique ``SELECT``, soit un seul aller-retour réseau. Cette
     fonction est principalement destinée aux tableaux de bord
     d'administration et de supervision.
 
+    En mode approximatif, les estimations de PostgreSQL
+    (``pg_class.reltuples``) sont lues à la place des comptages, sans
+    parcours des tables. Si une table n'a encore jamais été analysée,
+    le comptage exact est utilisé.
+
     Args:
         db (Session): Session SQLAlchemy active.
+        approximate (bool): Utiliser les estimations de PostgreSQL
+            plutôt qu'un comptage exact. Par défaut ``False``.
 
     Returns:
         dict: Dictionnaire contenant les clés suivantes :
@@ -257,12 +456,17 @@ def get_global_stats(db: Session) -> dict:
             - ``total_predictions`` (int) : Nombre total de prédictions
               effectuées sur la plateforme.
     """
-    total_users = db.query(func.count(User.id)).scalar()
-    total_predictions = db.query(func.count(Prediction.id)).scalar()
+    row = None
+    if approximate:
+        row = db.execute(_GLOBAL_ESTIMATES).one()
+        if row.total_users < 0 or row.total_predictions < 0:
+            row = None
+    if row is None:
+        row = db.execute(_GLOBAL_COUNTS).one()
 
     return {
-        "total_users": total_users,
-        "total_predictions": total_predictions,
+        "total_users": row.total_users,
+        "total_predictions": row.total_predictions,
     }
 
 def add_favorite(db: Session, user_id: int, license_plate: str):
@@ -364,14 +568,12 @@ def create_vehicle(db: Session, vehicle_data: dict) -> Vehicle:
             à créer. Doit inclure au minimum la clé ``license_plate``.
 
     Returns:
-        Vehicle: Instance ORM du véhicule nouvellement créé, avec tous les
-            champs rafraîchis depuis la base de données (y compris ``id``).
+        Vehicle: Instance ORM du véhicule nouvellement créé.
     """
     db_vehicle = Vehicle(**vehicle_data)
     db.add(db_vehicle)
     db.commit()
-    db.refresh(db_vehicle)
-    print(f"Véhicule créé en base de données : {db_vehicle}")
+    logger.debug("Véhicule créé en base de données : %s", db_vehicle)
     return db_vehicle
 
 def get_vehicle_info_history_by_user(db: Session, user_id: int):
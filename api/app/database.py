@@ -21,6 +21,10 @@ Composants exposés :
       tables définies dans les modèles ORM.
     - ``get_db``          — Générateur de dépendance FastAPI fournissant
       une session SQLAlchemy avec fermeture automatique.
+    - ``pool_stats``      — Retourne l'occupation du pool de connexions
+      du moteur.
+    - ``ping``            — Vérifie la disponibilité de la base de
+      données.
 
 Relations entre modèles :
     - Un ``User`` possède zéro ou plusieurs ``Prediction`` (relation
@@ -36,28 +40,64 @@ Index :
 Version : 1.0.0
 """
 
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, Boolean, ForeignKey, Index, JSON, Table, LargeBinary
+from sqlalchemy import create_engine, text, Column, Integer, String, DateTime, Boolean, ForeignKey, Index, JSON, Table, LargeBinary
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import sessionmaker, relationship
+from sqlalchemy.pool import NullPool, QueuePool
 from datetime import datetime
 from app.config import settings
 
-# Moteur SQLAlchemy connecté à la base de données PostgreSQL. Le
-# paramètre ``echo`` active la journalisation des requêtes SQL en mode
-# debug, et ``pool_pre_ping`` vérifie la validité des connexions avant
+# Options de pool du moteur. Par défaut, chaque processus maintient son
+# propre pool, dimensionné par la configuration (voir ``DB_POOL_*`` dans
+# ``app.config``) pour absorber les pics de requêtes concurrentes du
+# pool de threads de FastAPI sans épuiser les connexions par défaut
+# (5 + 10) ; ``pool_pre_ping`` vérifie la validité des connexions avant
 # leur réutilisation pour éviter les erreurs de connexion périmée.
-engine = create_engine(
-    settings.DATABASE_URL,
-    echo=settings.DEBUG,
-    pool_pre_ping=True,
-)
+#
+# Derrière PgBouncer en mode transaction (``DB_EXTERNAL_POOLER``), le
+# multiplexage des connexions est délégué au pooler : chaque session
+# ouvre une connexion vers PgBouncer et la ferme à la fin, sans pool
+# côté SQLAlchemy (``NullPool``) ni ping, PgBouncer gérant lui-même
+# les connexions mortes vers PostgreSQL. psycopg2 n'utilise pas de
+# requêtes préparées côté serveur, incompatibles avec ce mode.
+if settings.DB_EXTERNAL_POOLER:
+    _pool_options = {"poolclass": NullPool}
+else:
+    _pool_options = {
+        "pool_pre_ping": True,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+    }
+
+# Moteur SQLAlchemy connecté à la base de données PostgreSQL. La
+# journalisation des requêtes SQL (``echo``) est désactivée : son coût
+# de formatage était payé sur chaque requête en mode debug. Le
+# profilage ciblé passe par ``app.sql_profiling`` (voir
+# ``SQL_PROFILE`` dans ``app.config``).
+engine = create_engine(settings.DATABASE_URL, echo=False, **_pool_options)
+
+if settings.SQL_PROFILE:
+    from app.sql_profiling import install as install_sql_profiling
+
+    install_sql_profiling(engine)
 
 # Fabrique de sessions SQLAlchemy. Les sessions créées par cette
 # fabrique ne valident pas automatiquement les transactions
 # (``autocommit=False``) et ne synchronisent pas automatiquement
 # les objets en mémoire avec la base (``autoflush=False``), laissant
-# un contrôle explicite au développeur.
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# un contrôle explicite au développeur. Les instances ne sont pas
+# expirées au commit (``expire_on_commit=False``) : les valeurs venant
+# d'être écrites restent lisibles, notamment par la sérialisation des
+# réponses, sans SELECT de rechargement.
+SessionLocal = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    expire_on_commit=False,
+    bind=engine,
+)
 
 # Classe de base déclarative dont héritent tous les modèles ORM de
 # l'application. Elle fournit les métadonnées nécessaires à SQLAlchemy
@@ -149,7 +189,7 @@ class Prediction(Base):
     Chaque prédiction est associée à un utilisateur et contient le nom
     du fichier image soumis ainsi que les résultats de la reconnaissance
     (plaques détectées, scores de confiance, coordonnées des boîtes
-    englobantes) stockés au format JSON.
+    englobantes) stockés au format JSON (``jsonb`` sous PostgreSQL).
 
     Attributes:
         id (int): Identifiant unique auto-incrémenté (clé primaire).
@@ -172,7 +212,11 @@ class Prediction(Base):
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     filename = Column(String, nullable=False)
-    results = Column(JSON, nullable=False)
+    # ``jsonb`` sous PostgreSQL : stockage binaire décodé une seule fois
+    # à l'écriture, au lieu du texte reparsé à chaque lecture par
+    # ``json``. Aucun index GIN n'est défini tant qu'aucune requête ne
+    # filtre sur le contenu des résultats.
+    results = Column(JSON().with_variant(JSONB(), "postgresql"), nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
 
     # Relation bidirectionnelle many-to-one vers le modèle User.
@@ -281,4 +325,49 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+def pool_stats() -> dict:
+    """
+    Retourner l'occupation du pool de connexions du moteur.
+
+    Destinée à la supervision (``GET /health/db``) : un nombre de
+    connexions empruntées proche de ``DB_POOL_SIZE + DB_MAX_OVERFLOW``
+    indique que les requêtes attendent une connexion libre
+    (``DB_POOL_TIMEOUT``) et que le pool, ou ``max_connections`` côté
+    PostgreSQL, doit être redimensionné.
+
+    Returns:
+        dict: Dictionnaire contenant les clés suivantes :
+            - ``pool`` (str) : Classe du pool (``QueuePool``, ou
+              ``NullPool`` derrière un pooler externe).
+            - ``size`` (int) : Taille nominale du pool.
+            - ``checked_in`` (int) : Connexions ouvertes et disponibles.
+            - ``checked_out`` (int) : Connexions en cours d'utilisation.
+            - ``overflow`` (int) : Connexions ouvertes au-delà de la
+              taille nominale.
+            Seule la clé ``pool`` est présente pour un ``NullPool``.
+    """
+    pool = engine.pool
+    stats = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=pool.overflow(),
+        )
+    return stats
+
+
+def ping() -> None:
+    """
+    Vérifier la disponibilité de la base de données (``SELECT 1``).
+
+    Raises:
+        sqlalchemy.exc.SQLAlchemyError: Si aucune connexion ne peut être
+            obtenue ou si la requête échoue.
+    """
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
@@ -10,12 +10,12 @@ de cycle de vie (démarrage et arrêt) de l'application.
 Composants exposés :
     - ``app``              — Instance principale de l'application
       FastAPI, point d'entrée ASGI pour le serveur Uvicorn.
-    - ``startup_event``    — Gestionnaire d'événement exécuté au
-      démarrage de l'application, responsable de la création des tables
-      en base de données et du chargement du modèle de reconnaissance
-      de plaques.
-    - ``shutdown_event``   — Gestionnaire d'événement exécuté à l'arrêt
-      de l'application, responsable de la journalisation de l'arrêt.
+    - ``lifespan``         — Gestionnaire de cycle de vie exécuté au
+      démarrage de l'application (création des tables en base de
+      données et lancement du chargement du modèle de reconnaissance
+      de plaques en arrière-plan)
+      puis à son arrêt (arrêt des pools d'inférence, fermeture du client
+      Redis, journalisation).
     - ``root``             — Endpoint racine (``GET /``) retournant un
       message d'accueil avec les informations de base de l'API.
     - ``list_versions``    — Endpoint de découverte des versions
@@ -81,23 +81,34 @@ Conformité RGPD :
 
 Cycle de vie :
     - **Démarrage** — Les tables de la base de données sont créées (si
-      elles n'existent pas) via ``create_tables()``, puis le modèle de
-      reconnaissance de plaques est chargé en mémoire via
-      ``plate_predictor.load_model()``. Un message de succès ou d'erreur
-      est journalisé selon le résultat du chargement.
-    - **Arrêt** — Un message de journalisation est émis pour signaler
-      l'arrêt propre de l'API.
+      elles n'existent pas) via ``create_tables()``, exécuté dans un
+      thread. Le chargement du modèle de reconnaissance de plaques est
+      ensuite lancé en arrière-plan via ``plate_predictor.load_model()``,
+      sans attendre sa fin : le serveur accepte les connexions
+      immédiatement, ``GET /health/model`` indique l'état du chargement
+      et les endpoints de prédiction répondent 503 (``Retry-After``)
+      tant que le modèle n'est pas chargé. La file de regroupement des
+      prédictions (``batch_queue``) est démarrée, puis le client du
+      cache Redis est créé si ``REDIS_URL`` est configuré.
+    - **Arrêt** — La file de lots est arrêtée (requêtes en attente
+      annulées), le client Redis fermé et les pools d'inférence
+      (``MODEL_EXECUTOR``, ``OCR_EXECUTOR``) libérés, puis un message
+      de journalisation signale l'arrêt propre de l'API.
 
 Version : 1.0.0
 """
 
 # ==================== Dependencies ====================
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
+import asyncio
 import warnings
 import logging
+from app import redis_cache
 from app.database import create_tables
-from app.predictor import plate_predictor
+from app.predictor import MODEL_EXECUTOR, OCR_EXECUTOR, plate_predictor
 from app.routers.v1 import account, predictions, admin, model, vehicles, favorites
 from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
@@ -125,16 +136,91 @@ logging.basicConfig(
 # modèle).
 logger = logging.getLogger(__name__)
 
+# ==================== Model Preloading ====================
+
+# Avec ``MODEL_PRELOAD``, le modèle est chargé ici, de façon synchrone,
+# à l'import du module ; l'appel à ``load_model`` du ``lifespan`` devient
+# alors sans effet. Réservé à un processus unique : ``gunicorn_conf.py``
+# ne l'active pas, le modèle ne devant pas être chargé avant le fork des
+# workers.
+if settings.MODEL_PRELOAD:
+    plate_predictor.load_model(blocking=True)
+
+# ==================== Lifespan ====================
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Initialiser puis libérer les ressources de l'application.
+
+    Gestionnaire de cycle de vie FastAPI (``lifespan``). La partie
+    précédant ``yield`` est exécutée une seule fois au démarrage du
+    serveur ASGI, avant l'acceptation de la première connexion :
+
+        1. **Création des tables** — Appelle ``create_tables()`` pour
+           générer les tables SQL à partir des modèles ORM SQLAlchemy
+           si elles n'existent pas encore en base de données (DDL
+           auto-généré via ``Base.metadata.create_all``).
+        2. **Chargement du modèle** — Lance le chargement du modèle de
+           reconnaissance de plaques en arrière-plan via
+           ``plate_predictor.load_model()``, sans attendre sa fin. Sans
+           effet si le modèle a été préchargé (``MODEL_PRELOAD``).
+        3. **File de lots** — Démarre ``plate_predictor.batch_queue``,
+           qui regroupe les prédictions concurrentes.
+        4. **Cache Redis** — Crée le client du cache partagé des
+           résultats de prédiction, si ``REDIS_URL`` est configuré.
+
+    La création des tables est exécutée dans un thread
+    (``asyncio.to_thread``) afin de ne pas bloquer la boucle
+    d'événements. La partie suivant ``yield`` est exécutée à l'arrêt
+    propre du serveur.
+
+    Le chargement du modèle (plusieurs secondes) ne retarde pas la
+    disponibilité de l'API : les endpoints ne dépendant pas du modèle
+    répondent immédiatement, ``GET /health/model`` indique l'état du
+    chargement, et les endpoints de prédiction retournent une erreur
+    HTTP 503 avec un en-tête ``Retry-After`` tant que le modèle n'est
+    pas chargé (y compris en cas d'échec du chargement).
+
+    Args:
+        app (FastAPI): Instance de l'application.
+    """
+    await asyncio.to_thread(create_tables)
+
+    # Chargement du modèle dans un thread d'arrière-plan : le résultat
+    # est journalisé par ``load_model`` à la fin du chargement.
+    plate_predictor.load_model()
+
+    # Regroupement par lots des prédictions concurrentes.
+    await plate_predictor.batch_queue.start()
+
+    # Cache partagé des résultats de prédiction (optionnel).
+    await redis_cache.connect()
+
+    yield
+
+    # Arrêt de la file de lots puis libération des threads d'inférence.
+    await plate_predictor.batch_queue.stop()
+    await redis_cache.close()
+    MODEL_EXECUTOR.shutdown(wait=False, cancel_futures=True)
+    OCR_EXECUTOR.shutdown(wait=False, cancel_futures=True)
+    logger.info("🛑 Arrêt de l'API LRS")
+
+
 # ==================== Application FastAPI ====================
 
 # Instance principale de l'application FastAPI. Les métadonnées
 # ``title``, ``version`` et ``description`` sont utilisées pour
 # générer automatiquement la documentation OpenAPI (Swagger UI /
-# ReDoc) accessible aux endpoints ``/docs`` et ``/redoc``.
+# ReDoc) accessible aux endpoints ``/docs`` et ``/redoc``. Les
+# réponses sont encodées par orjson (``ORJSONResponse``), nettement
+# plus rapide que le module ``json`` de la bibliothèque standard.
 app = FastAPI(
     title=settings.API_TITLE,
     version=settings.API_VERSION,
     description=settings.API_DESCRIPTION,
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # Le limitateur utilise l'adresse IP du client comme
@@ -146,51 +232,6 @@ app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
 
-# ==================== Startup & Shutdown ====================
-
-@app.on_event("startup")
-async def startup_event():
-    """
-    Initialiser les ressources de l'application au démarrage.
-
-    Gestionnaire d'événement FastAPI exécuté une seule fois lors du
-    démarrage du serveur ASGI. Il procède en deux étapes :
-
-        1. **Création des tables** — Appelle ``create_tables()`` pour
-           générer les tables SQL à partir des modèles ORM SQLAlchemy
-           si elles n'existent pas encore en base de données (DDL
-           auto-généré via ``Base.metadata.create_all``).
-        2. **Chargement du modèle** — Charge le modèle de reconnaissance
-           de plaques en mémoire via ``plate_predictor.load_model()`` et
-           journalise le résultat de l'opération.
-
-    En cas d'échec du chargement du modèle, l'application démarre
-    malgré tout mais les endpoints de prédiction retourneront une
-    erreur HTTP 503 tant que le modèle n'aura pas été chargé avec
-    succès.
-    """
-
-    create_tables()
-
-    # Charger le modèle au démarrage (blocant pour eviter les 503 initiaux)
-    if plate_predictor.load_model(blocking=True):
-        logger.info("✅ Modèle chargé avec succès")
-    else:
-        logger.error("❌ Modèle non chargé")
-
-
-@app.on_event("shutdown")
-async def shutdown_event():
-    """
-    Libérer les ressources de l'application à l'arrêt.
-
-    Gestionnaire d'événement FastAPI exécuté lors de l'arrêt propre
-    du serveur ASGI. Il journalise un message signalant l'arrêt de
-    l'API pour faciliter le suivi opérationnel et le diagnostic.
-    """
-    logger.info("🛑 Arrêt de l'API LRS")
-
-
 # ==================== Include Routers ====================
 
 # Enregistrement des routeurs FastAPI. Chaque routeur est associé
@@ -246,8 +287,26 @@ app.include_router(informations.router, prefix="", tags=["Global Informations"])
 # ==================== Main Entry ====================
 
 # Point d'entrée pour l'exécution autonome de l'application via
-# ``python -m app.main``. Lance le serveur Uvicorn sur le port 8000
-# avec rechargement automatique activé (mode développement).
+# ``python -m app.main``. Lance le serveur Uvicorn sur le port 8000 avec
+# la boucle d'événements ``uvloop`` et le parseur HTTP ``httptools``
+# (fournis par ``uvicorn[standard]``). En mode debug, un seul processus
+# est lancé avec rechargement automatique ; sinon, le nombre de workers
+# est lu depuis ``WEB_CONCURRENCY`` (1 par défaut, chaque worker
+# chargeant sa propre copie du modèle en mémoire).
+#
+# Forme équivalente en ligne de commande (conteneurs) :
+#   uvicorn app.main:app --loop uvloop --http httptools --workers 4
 if __name__ == "__main__":
+    import os
     import uvicorn
-    uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True, log_level="info")
+
+    uvicorn.run(
+        "app.main:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="uvloop",
+        http="httptools",
+        reload=settings.DEBUG,
+        workers=None if settings.DEBUG else int(os.getenv("WEB_CONCURRENCY", "1")),
+        log_level="info",
+    )
@@ -5,15 +5,22 @@ Le moteur detecte directement les plaques dans l'image complete,
 puis applique OCR sur chaque zone detectee.
 """
 
+import hashlib
+import logging
 import os
 import warnings
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 
 import cv2
 import numpy as np
 import easyocr
+import torch
 from ultralytics import YOLO
 from huggingface_hub import hf_hub_download
 
+logger = logging.getLogger(__name__)
+
 
 class CFG:
     """Configuration du moteur LPR HuggingFace."""
@@ -23,6 +30,22 @@ class CFG:
     hf_config_filename = os.getenv("LPR_HF_CONFIG_FILENAME", "config.json")
     # hf_local_dir n'est plus utilisé avec la méthode hf_hub_download standard
 
+    # Chemin local optionnel vers un modele de detection deja exporte
+    # (ex. moteur TensorRT ``.engine`` produit par ``yolo export format=engine``
+    # a partir du modele ONNX). Prioritaire sur le telechargement HuggingFace.
+    model_path = os.getenv("LPR_MODEL_PATH", "")
+
+    # Peripherique d'inference: "cpu" ou "cuda:0". Sur GPU, EasyOCR est aussi
+    # execute sur CUDA et ultralytics selectionne le CUDAExecutionProvider
+    # d'onnxruntime (onnxruntime-gpu requis).
+    device = os.getenv("LPR_DEVICE", "cpu")
+
+    # Threads intra-op de la session ONNX Runtime du detecteur sur CPU. Par
+    # defaut OMP_NUM_THREADS, fixe pour chaque worker par gunicorn_conf.py
+    # (ONNX Runtime ne lit pas cette variable lui-meme). 0 conserve le
+    # choix d'ONNX Runtime: un thread par coeur.
+    ort_threads = int(os.getenv("LPR_ORT_THREADS", os.getenv("OMP_NUM_THREADS", "0")))
+
     # Seuil de confiance detection; aligne sur l'exemple utilisateur (0.5) pour la fiabilite
     plate_conf = float(os.getenv("LPR_PLATE_CONF", 0.5))
 
@@ -31,9 +54,61 @@ class CFG:
     ocr_languages = [lang for lang in os.getenv("LPR_OCR_LANGS", "en,de,fr,es,it,nl").split(",") if lang]
     ocr_allowlist = os.getenv("LPR_OCR_ALLOWLIST", "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ")
 
+    # Precision de l'OCR. Sur GPU, EasyOCR est execute en FP16 (autocast) pour
+    # exploiter les tensor cores. Sur CPU, EasyOCR peut quantifier ses modeles
+    # en int8 (quantification dynamique, option ``quantize`` du Reader, active
+    # par defaut dans EasyOCR); desactive ici par defaut, a valider sur un
+    # jeu de plaques avant activation.
+    ocr_half = os.getenv("LPR_OCR_HALF", "1") == "1"
+    ocr_quantize = os.getenv("LPR_OCR_QUANTIZE", "0") == "1"
+
+    # Compilation du recognizer EasyOCR avec torch.compile (TorchInductor):
+    # fusion des kernels du CRNN, compilee pendant le warmup. Desactivee par
+    # defaut (demarrage plus long); le detecteur ONNX n'est pas concerne.
+    # Definir TORCHINDUCTOR_CACHE_DIR sur un volume persistant evite de
+    # recompiler a chaque redemarrage du conteneur.
+    ocr_compile = os.getenv("LPR_OCR_COMPILE", "0") == "1"
+
+    # Plus grand cote de l'image transmise au detecteur. Les images plus grandes
+    # sont reduites (INTER_AREA) avant la detection; l'OCR travaille toujours
+    # sur des crops pleine resolution. 0 desactive la reduction.
+    detect_max_side = int(os.getenv("LPR_DETECT_MAX_SIDE", 1280))
+
+    # Sur CPU, reduction et conversion RGB de l'image pleine resolution via
+    # OpenCL (cv2.UMat, iGPU) si disponible. Les crops de plaque restent des
+    # vues NumPy (sans copie) : trop petits pour amortir le transfert.
+    detect_opencl = os.getenv("LPR_DETECT_OPENCL", "0") == "1"
+
     # Warmup pour eviter le spike de latence sur la 1ere requete
     warmup_enabled = os.getenv("LPR_WARMUP", "1") == "1"
     warmup_img_size = int(os.getenv("LPR_WARMUP_SIZE", 640))
+    # Tailles de lot du detecteur a prechauffer (alignees sur le regroupement
+    # des requetes, voir INFERENCE_BATCH_SIZE dans app.config)
+    warmup_batch_sizes = [int(n) for n in os.getenv("LPR_WARMUP_BATCH_SIZES", "1,4,8").split(",") if n]
+
+
+def model_fingerprint() -> str:
+    """
+    Empreinte courte de la configuration qui determine les lectures.
+
+    Couvre le modele de detection (depot et fichier HuggingFace, chemin
+    local), les seuils de confiance, la reduction avant detection et les
+    reglages de l'OCR. Sert a invalider les resultats mis en cache par une
+    autre configuration (voir ``app.redis_cache``).
+    """
+    parts = (
+        CFG.hf_repo_id,
+        CFG.hf_model_filename,
+        CFG.model_path,
+        CFG.plate_conf,
+        CFG.detect_max_side,
+        CFG.ocr_conf,
+        ",".join(CFG.ocr_languages),
+        CFG.ocr_allowlist,
+        CFG.ocr_half,
+        CFG.ocr_quantize,
+    )
+    return hashlib.blake2b(repr(parts).encode(), digest_size=8).hexdigest()
 
 
 class LPRPipeline:
@@ -41,57 +116,168 @@ class LPRPipeline:
         """Initialise YOLO ONNX + EasyOCR avec fallback offline."""
         warnings.filterwarnings("ignore")
 
-        # Téléchargement via HuggingFace Hub (utilise le cache si disponible)
-        # Cela correspond à l'usage standard demandé par l'utilisateur
-        print(f"Loading YOLO model from HF: {CFG.hf_repo_id}/{CFG.hf_model_filename}")
-        model_path = hf_hub_download(
-            repo_id=CFG.hf_repo_id,
-            filename=CFG.hf_model_filename
-        )
-        # On s'assure aussi que la config est présente (optionnel mais recommandé)
-        hf_hub_download(
-            repo_id=CFG.hf_repo_id,
-            filename=CFG.hf_config_filename
+        # Le detecteur (telechargement HF + chargement ONNX) et EasyOCR
+        # (chargement des poids PyTorch) sont independants : ils sont charges
+        # en parallele, le temps de demarrage devient max(yolo, ocr) au lieu
+        # de yolo + ocr. Les deux bibliotheques liberent le GIL pendant les
+        # E/S disque et l'initialisation native.
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix="lpr-load") as executor:
+            detector_future = executor.submit(self._load_detector)
+            reader_future = executor.submit(self._load_reader)
+            self.plate_model, self._detector_path = detector_future.result()
+            self.reader = reader_future.result()
+        print(f"EasyOCR initialized with languages: {CFG.ocr_languages}")
+        self._limit_detector_threads()
+        self._use_opencl = (
+            CFG.detect_opencl and CFG.device == "cpu" and cv2.ocl.haveOpenCL()
         )
+        self._configure_ocr_precision()
+        if CFG.ocr_compile:
+            self._compile_ocr()
+
+        # Plus grande taille de lot acceptee par le detecteur quand le warmup
+        # a revele une limite (1 pour un modele exporte avec un lot statique).
+        # None si aucune limite n'a ete constatee ou si le warmup est desactive.
+        self.max_batch_size = None
+        if CFG.warmup_enabled:
+            self._warmup()
+
+    @staticmethod
+    def _load_detector() -> tuple:
+        """
+        Charge le detecteur YOLO (chemin local ou telechargement HuggingFace).
+
+        Retourne ``(modele, chemin_du_modele)``.
+        """
+        if CFG.model_path:
+            print(f"Loading YOLO model from local path: {CFG.model_path}")
+            model_path = CFG.model_path
+        else:
+            # Téléchargement via HuggingFace Hub (utilise le cache si disponible)
+            # Cela correspond à l'usage standard demandé par l'utilisateur
+            print(f"Loading YOLO model from HF: {CFG.hf_repo_id}/{CFG.hf_model_filename}")
+            model_path = hf_hub_download(
+                repo_id=CFG.hf_repo_id,
+                filename=CFG.hf_model_filename
+            )
+            # On s'assure aussi que la config est présente (optionnel mais recommandé)
+            hf_hub_download(
+                repo_id=CFG.hf_repo_id,
+                filename=CFG.hf_config_filename
+            )
+
+        return YOLO(model_path, task="detect"), str(model_path)
+
+    def _limit_detector_threads(self) -> None:
+        """
+        Borne le nombre de threads de la session ONNX Runtime du detecteur.
 
-        self.plate_model = YOLO(model_path, task="detect")
-        self.reader = easyocr.Reader(
+        ultralytics cree la session a la premiere inference, avec les options
+        par defaut (un thread intra-op par coeur) : une passe a blanc
+        l'instancie, puis elle est remplacee par une session equivalente
+        limitee a ``CFG.ort_threads`` threads. Modele ONNX sur CPU uniquement.
+        """
+        if CFG.ort_threads <= 0 or CFG.device != "cpu" or not self._detector_path.endswith(".onnx"):
+            return
+        try:
+            import onnxruntime
+
+            dummy = np.zeros((64, 64, 3), dtype=np.uint8)
+            self.plate_model(dummy, conf=CFG.plate_conf, device=CFG.device, verbose=False)
+            backend = self.plate_model.predictor.model
+
+            options = onnxruntime.SessionOptions()
+            options.intra_op_num_threads = CFG.ort_threads
+            options.inter_op_num_threads = 1
+            backend.session = onnxruntime.InferenceSession(
+                self._detector_path,
+                options,
+                providers=backend.session.get_providers(),
+            )
+        except Exception as exc:
+            logger.warning("Limitation des threads ONNX Runtime impossible: %s", exc)
+
+    @staticmethod
+    def _load_reader():
+        """Charge le lecteur EasyOCR sur le peripherique configure."""
+        gpu = CFG.device.startswith("cuda")
+        return easyocr.Reader(
             CFG.ocr_languages,
-            gpu=False,
+            gpu=gpu,
             verbose=False,
+            # Selection des algorithmes cuDNN les plus rapides, mesuree lors
+            # du warmup puis reutilisee pour les requetes.
+            cudnn_benchmark=gpu,
+            # Quantification int8 sur CPU (sans effet sur GPU), voir CFG.
+            quantize=CFG.ocr_quantize,
         )
-        print(f"EasyOCR initialized with languages: {CFG.ocr_languages}")
 
-        if CFG.warmup_enabled:
-            self._warmup()
+    def _configure_ocr_precision(self) -> None:
+        """Selectionne la precision de l'OCR selon le peripherique (voir CFG)."""
+        self._ocr_autocast = nullcontext
+        # Sur CPU, la quantification int8 est appliquee par EasyOCR lui-meme
+        # au chargement (``quantize``, voir ``_load_reader``).
+        if CFG.device.startswith("cuda") and CFG.ocr_half:
+            self._ocr_autocast = lambda: torch.autocast("cuda", dtype=torch.float16)
 
-    def _warmup(self) -> None:
-        """Lance une passe a blanc pour compiler les kernels ONNX avant la 1ere requete."""
-        try:
-            size = CFG.warmup_img_size
-            dummy = np.zeros((size, size, 3), dtype=np.uint8)
-            _ = self.plate_model(dummy, conf=CFG.plate_conf, verbose=False)
-        except Exception:
-            # Le warmup ne doit pas bloquer l'API en cas d'echec
-            pass
-
-    def extract_roi(self, image: np.ndarray, bbox: list) -> np.ndarray:
-        """Extrait une ROI en bornant les coordonnees a l'image."""
-        x_min, y_min, x_max, y_max = map(int, bbox)
-
-        h, w = image.shape[:2]
-        x_min = max(0, min(x_min, w))
-        x_max = max(0, min(x_max, w))
-        y_min = max(0, min(y_min, h))
-        y_max = max(0, min(y_max, h))
-
-        return image[y_min:y_max, x_min:x_max]
-
-    def extract_ocr(self, roi_img: np.ndarray) -> tuple:
-        """Retourne (texte_plaque, confiance_max) pour un crop de plaque."""
-        if roi_img.size == 0:
-            return "", 0.0
+    def _compile_ocr(self) -> None:
+        """
+        Compile le recognizer EasyOCR avec torch.compile.
+
+        Sur GPU, EasyOCR enveloppe le recognizer dans ``DataParallel`` : seul
+        le module interne est compile. ``dynamic=True`` car la largeur des
+        crops de plaque varie d'une requete a l'autre. La compilation
+        effective a lieu a la premiere passe, donc pendant le warmup.
+        """
+        recognizer = self.reader.recognizer
+        if isinstance(recognizer, torch.nn.DataParallel):
+            recognizer.module = torch.compile(recognizer.module, dynamic=True)
+        else:
+            self.reader.recognizer = torch.compile(recognizer, dynamic=True)
+        print("EasyOCR recognizer compiled with torch.compile")
 
+    def _warmup(self) -> None:
+        """
+        Lance des passes a blanc avant la 1ere requete.
+
+        Le detecteur est execute pour chaque taille de lot de
+        ``CFG.warmup_batch_sizes`` (compilation des kernels ONNX, allocation
+        des buffers par forme d'entree), puis EasyOCR : detection de texte et
+        recognizer, ce dernier n'etant jamais atteint par une image vide via
+        ``readtext``. Le pipeline n'est expose aux requetes qu'apres ces
+        passes, la premiere requete reelle a donc la latence nominale.
+
+        Chaque passe est isolee : un echec est journalise sans bloquer l'API
+        ni les passes suivantes. Si une passe en lot echoue (modele ONNX
+        exporte avec un lot statique de 1), ``max_batch_size`` est ramene a
+        la plus grande taille validee pour que les requetes ne soient plus
+        regroupees au-dela.
+        """
+        size = CFG.warmup_img_size
+        dummy = np.zeros((size, size, 3), dtype=np.uint8)
+        largest_ok = 0
+        for batch_size in sorted(CFG.warmup_batch_sizes):
+            batch = dummy if batch_size == 1 else [dummy] * batch_size
+            try:
+                self.plate_model(batch, conf=CFG.plate_conf, device=CFG.device, verbose=False)
+                largest_ok = batch_size
+            except Exception as exc:
+                logger.warning("Warmup du detecteur (lot de %d) en echec: %s", batch_size, exc)
+                if batch_size > 1:
+                    self.max_batch_size = max(largest_ok, 1)
+                    break
+
+        plate = np.full((64, 256), 255, dtype=np.uint8)
+        for stage, warm in (("readtext", self.reader.readtext), ("recognize", self.reader.recognize)):
+            try:
+                with torch.inference_mode(), self._ocr_autocast():
+                    warm(plate, allowlist=CFG.ocr_allowlist)
+            except Exception as exc:
+                logger.warning("Warmup EasyOCR (%s) en echec: %s", stage, exc)
+
+    @staticmethod
+    def _prepare_ocr_crop(roi_img: np.ndarray) -> np.ndarray:
+        """Pretraite un crop RGB de plaque pour EasyOCR (N&B, contraste, marge)."""
         # 1. Conversion N&B
         gray = cv2.cvtColor(roi_img, cv2.COLOR_RGB2GRAY)
 
@@ -107,62 +293,176 @@ class LPRPipeline:
 
         # 4. Ajout de bordures (padding) pour eviter que les caracteres touchent le bord
         # EasyOCR performe mieux avec un peu d'espace autour du texte
-        gray = cv2.copyMakeBorder(gray, 10, 10, 10, 10, cv2.BORDER_CONSTANT, value=[255, 255, 255])
-
-        results = self.reader.readtext(
-            gray,
-            allowlist=CFG.ocr_allowlist,
-        )
-
-        text_plate = ""
-        max_conf = 0.0
+        return cv2.copyMakeBorder(gray, 10, 10, 10, 10, cv2.BORDER_CONSTANT, value=[255, 255, 255])
 
-        for _, text, conf in results:
-            if conf > CFG.ocr_conf:
-                text_plate += text
-                max_conf = max(max_conf, conf)
+    @staticmethod
+    def _parse_ocr(results: list) -> tuple:
+        """Assemble (texte_plaque, confiance_max) a partir des lignes EasyOCR."""
+        kept = [(text, conf) for _, text, conf in results if conf > CFG.ocr_conf]
+        text_plate = "".join(text for text, _ in kept)
+        max_conf = max((conf for _, conf in kept), default=0.0)
 
         return text_plate.upper().replace(" ", ""), float(max_conf)
 
-    def run(self, image_np: np.ndarray) -> list:
+    def extract_ocr_batch(self, roi_imgs: list) -> list:
         """
-        Execute la detection et retourne une liste de:
-        {"plate": <str>, "confidence": <float>}.
+        Retourne (texte_plaque, confiance_max) pour chaque crop de plaque.
+
+        Plusieurs crops sont lus en un seul appel ``readtext_batched`` : la
+        detection de texte CRAFT s'execute en une passe sur le lot au lieu
+        d'une passe par plaque. Les crops pretraites sont completes en blanc
+        (a droite et en bas) jusqu'a une taille commune, sans deformation
+        des caracteres. Un crop seul passe par ``readtext``.
+        """
+        outputs = [("", 0.0)] * len(roi_imgs)
+        indices = [i for i, roi in enumerate(roi_imgs) if roi.size]
+        if not indices:
+            return outputs
+
+        grays = [self._prepare_ocr_crop(roi_imgs[i]) for i in indices]
+
+        with torch.inference_mode(), self._ocr_autocast():
+            if len(grays) == 1:
+                batch_results = [self.reader.readtext(grays[0], allowlist=CFG.ocr_allowlist)]
+            else:
+                height = max(gray.shape[0] for gray in grays)
+                width = max(gray.shape[1] for gray in grays)
+                padded = [
+                    cv2.copyMakeBorder(
+                        gray, 0, height - gray.shape[0], 0, width - gray.shape[1],
+                        cv2.BORDER_CONSTANT, value=255,
+                    )
+                    for gray in grays
+                ]
+                batch_results = self.reader.readtext_batched(
+                    padded,
+                    allowlist=CFG.ocr_allowlist,
+                    batch_size=len(padded),
+                )
+
+        for i, results in zip(indices, batch_results):
+            outputs[i] = self._parse_ocr(results)
+        return outputs
+
+    def _detection_input(self, image_bgr: np.ndarray) -> tuple:
         """
-        plates_found = []
+        Prepare l'image transmise au detecteur: (image_rgb, echelle).
+
+        Les photos haute resolution sont reduites a ``CFG.detect_max_side``
+        avant la conversion RGB : le detecteur travaille de toute facon en
+        640 px, et la reduction en amont evite de convertir puis de
+        transferer l'image pleine resolution. ``echelle`` est le rapport
+        taille reduite / taille d'origine (1.0 si l'image n'est pas reduite).
+        Avec ``CFG.detect_opencl`` sur CPU, ces deux operations passent par
+        OpenCL (``cv2.UMat``).
+        """
+        max_side = max(image_bgr.shape[:2])
+        scale = 1.0
+        if self._use_opencl:
+            # Un seul envoi vers le peripherique OpenCL, un seul retour.
+            image_bgr = cv2.UMat(image_bgr)
+        if 0 < CFG.detect_max_side < max_side:
+            scale = CFG.detect_max_side / max_side
+            image_bgr = cv2.resize(image_bgr, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        image_rgb = cv2.cvtColor(image_bgr, cv2.COLOR_BGR2RGB)
+        if self._use_opencl:
+            image_rgb = image_rgb.get()
+        return image_rgb, scale
+
+    def _plate_crops(self, image_bgr: np.ndarray, detection_results, scale: float = 1.0) -> list:
+        """
+        Extrait le crop RGB de chaque plaque detectee dans une image BGR.
 
-        image_rgb = cv2.cvtColor(image_np, cv2.COLOR_BGR2RGB)
-        detection_results = self.plate_model(image_rgb, conf=CFG.plate_conf, verbose=False)
+        Les bbox, exprimees dans l'image transmise au detecteur, sont
+        ramenees a l'image d'origine (division par ``scale``) : les crops
+        sont extraits en pleine resolution puis convertis en RGB.
+        """
+        crops = []
 
         for result in detection_results:
             boxes = result.boxes
             if boxes is None:
                 continue
 
-            for box in boxes:
-                x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
-
-                # Expansion de la bbox de 5% pour ne pas couper les caracteres sur les bords
-                # Cela aide grandement l'OCR en donnant du contexte (padding naturel)
-                w_box = x2 - x1
-                h_box = y2 - y1
-                margin_x = w_box * 0.05
-                margin_y = h_box * 0.05
-
-                x1 = x1 - margin_x
-                x2 = x2 + margin_x
-                y1 = y1 - margin_y
-                y2 = y2 + margin_y
-
-                plate_img = self.extract_roi(image_rgb, [x1, y1, x2, y2])
-                text, conf = self.extract_ocr(plate_img)
-                if text:
-                    plates_found.append(
-                        {
-                            "plate": text,
-                            "confidence": float(conf),
-                        }
-                    )
+            # Une seule copie vers NumPy des bbox de l'image (N x 4, xyxy),
+            # au lieu d'un transfert par boite.
+            xyxy = boxes.xyxy.cpu().numpy() / scale
+
+            # Expansion de la bbox de 5% pour ne pas couper les caracteres sur les bords
+            # Cela aide grandement l'OCR en donnant du contexte (padding naturel)
+            size = xyxy[:, 2:] - xyxy[:, :2]
+            xyxy = xyxy + np.hstack((-size, size)) * 0.05
+
+            # Bornage a l'image et conversion en entiers en une passe NumPy
+            # pour toutes les boites.
+            h, w = image_bgr.shape[:2]
+            coords = np.clip(xyxy, 0, (w, h, w, h)).astype(np.int32)
+
+            for x_min, y_min, x_max, y_max in coords.tolist():
+                plate_img = image_bgr[y_min:y_max, x_min:x_max]
+                if plate_img.size:
+                    plate_img = cv2.cvtColor(plate_img, cv2.COLOR_BGR2RGB)
+                crops.append(plate_img)
+
+        return crops
+
+    @staticmethod
+    def _plates_found(ocr_results: list) -> list:
+        """Convertit les lectures OCR en resultats, en ecartant les textes vides."""
+        return [
+            {"plate": text, "confidence": float(conf)}
+            for text, conf in ocr_results
+            if text
+        ]
+
+    def detect_batch(self, images_np: list) -> list:
+        """
+        Etape de detection : un seul appel YOLO pour plusieurs images BGR.
+
+        Les images peuvent etre de tailles differentes : ultralytics les
+        redimensionne individuellement avant de les empiler en un tenseur
+        unique.
+
+        Retourne, par image et dans l'ordre recu, un triplet
+        ``(image_bgr, resultat_yolo, echelle)`` a transmettre a ``read_batch``.
+        """
+        if not images_np:
+            return []
+
+        inputs = [self._detection_input(image) for image in images_np]
+        detection_results = self.plate_model(
+            [image_rgb for image_rgb, _ in inputs],
+            conf=CFG.plate_conf,
+            device=CFG.device,
+            verbose=False,
+        )
+
+        # ultralytics retourne un objet Results par image d'entree.
+        return [
+            (image_bgr, result, scale)
+            for image_bgr, (_, scale), result in zip(images_np, inputs, detection_results)
+        ]
+
+    def read_batch(self, detections: list) -> list:
+        """
+        Etape OCR : lit les plaques detectees par ``detect_batch``.
 
-        return plates_found
+        Les crops de toutes les images du lot sont lus en un seul appel
+        ``extract_ocr_batch``, puis les lectures sont reparties par image.
+        Retourne, par image, la liste des plaques lues:
+        ``{"plate": <str>, "confidence": <float>}``.
+        """
+        crops_per_image = [
+            self._plate_crops(image_bgr, [result], scale)
+            for image_bgr, result, scale in detections
+        ]
+        ocr_results = self.extract_ocr_batch(
+            [crop for crops in crops_per_image for crop in crops]
+        )
 
+        plates = []
+        start = 0
+        for crops in crops_per_image:
+            plates.append(self._plates_found(ocr_results[start:start + len(crops)]))
+            start += len(crops)
+        return plates
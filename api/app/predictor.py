@@ -14,6 +14,21 @@ Composants exposés :
     - ``plate_predictor``    — Instance singleton globale de
       ``PlatePredictor``, partagée par l'ensemble de l'application
       FastAPI.
+    - ``ModelNotLoadedError`` — Exception levée par une prédiction
+      demandée avant la fin du chargement du modèle.
+    - ``MODEL_EXECUTOR``     — Pool d'un unique thread dédié à
+      l'inférence (détection YOLO), utilisé par
+      ``PlatePredictor.predict_async``.
+    - ``OCR_EXECUTOR``       — Pool d'un unique thread dédié à la
+      lecture OCR des plaques détectées.
+
+Les appels concurrents à ``predict_async`` sont regroupés en lots par
+la file ``PlatePredictor.batch_queue`` (voir ``app.batch_queue``),
+démarrée par le gestionnaire ``lifespan`` de l'application. Le
+traitement est découpé en trois étages exécutés dans des threads
+distincts : décodage (pool de threads par défaut), détection
+(``MODEL_EXECUTOR``) puis OCR (``OCR_EXECUTOR``). Sous charge, la
+détection du lot N + 1 s'exécute pendant la lecture OCR du lot N.
 
 Flux de traitement :
     1. L'image est reçue sous forme de bytes bruts depuis l'endpoint
@@ -23,15 +38,239 @@ Flux de traitement :
     3. L'image est transmise au pipeline ``LPRPipeline`` qui exécute
        la détection YOLO puis la lecture OCR.
     4. Le meilleur résultat (confiance maximale) est sélectionné et
-       retourné sous forme de dictionnaire normalisé.
+       retourné sous forme de liste de résultats normalisés, vide si
+       aucune plaque n'a été lue.
+
+Les résultats sont mémorisés, pendant ``settings.PREDICTION_CACHE_TTL``
+secondes, sous une empreinte BLAKE2b du contenu de l'image : une image
+soumise à nouveau (nouvel essai du client, doublon) est servie sans
+décodage ni inférence. ``predict_async`` consulte ensuite le cache
+Redis partagé entre les workers et les instances (``app.redis_cache``),
+s'il est configuré.
 
 Version : 1.0.0
 """
 
+import asyncio
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter
+from typing import Optional
+
 import cv2
 import numpy as np
+from cachetools import TTLCache
+from app import redis_cache
+from app.batch_queue import AsyncBatchQueue
+from app.config import settings
 from app.model.lpr_engine import LPRPipeline
 
+logger = logging.getLogger(__name__)
+
+# Format de pixel BGR de libjpeg-turbo (``turbojpeg.TJPF_BGR``), repris
+# ici pour ne pas importer PyTurboJPEG au chargement du module.
+TJPF_BGR = 1
+
+# Pool dédié à l'inférence, distinct du pool de threads de FastAPI : un
+# unique thread sérialise l'accès aux modèles (compatible GPU) sans
+# occuper les threads servant les endpoints synchrones, et la boucle
+# d'événements reste libre pendant l'inférence.
+MODEL_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="lpr-inference")
+
+# Pool dédié à l'étage OCR, pour que la lecture des plaques d'un lot
+# recouvre la détection du lot suivant dans ``MODEL_EXECUTOR``.
+OCR_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="lpr-ocr")
+
+# Cache des résultats de prédiction, indexé par l'empreinte du contenu
+# de l'image. Un TTL ou une taille nuls désactivent le cache.
+_result_cache: TTLCache = TTLCache(
+    maxsize=max(settings.PREDICTION_CACHE_SIZE, 1),
+    ttl=max(settings.PREDICTION_CACHE_TTL, 1),
+)
+_result_cache_lock = threading.Lock()
+_RESULT_CACHE_ENABLED = settings.PREDICTION_CACHE_SIZE > 0 and settings.PREDICTION_CACHE_TTL > 0
+
+
+def _image_digest(image_bytes: bytes) -> bytes:
+    """
+    Calculer l'empreinte du contenu d'une image.
+
+    BLAKE2b (bibliothèque standard) est plus rapide que SHA-256 sur les
+    processeurs 64 bits ; une empreinte de 16 octets suffit à écarter
+    les collisions accidentelles.
+
+    Args:
+        image_bytes (bytes): Données binaires de l'image.
+
+    Returns:
+        bytes: Empreinte de 16 octets.
+    """
+    return hashlib.blake2b(image_bytes, digest_size=16).digest()
+
+
+def _cached_result(key: bytes) -> Optional[list]:
+    """
+    Retourner une copie du résultat mémorisé pour ``key``, s'il existe.
+
+    Args:
+        key (bytes): Empreinte de l'image (voir ``_image_digest``).
+
+    Returns:
+        Optional[list]: Résultats de prédiction, ou ``None``.
+    """
+    if not _RESULT_CACHE_ENABLED:
+        return None
+    with _result_cache_lock:
+        result = _result_cache.get(key)
+    return [dict(plate) for plate in result] if result is not None else None
+
+
+def _store_result(key: bytes, result: list) -> None:
+    """
+    Mémoriser le résultat de prédiction d'une image.
+
+    Args:
+        key (bytes): Empreinte de l'image (voir ``_image_digest``).
+        result (list): Résultats retournés par ``PlatePredictor``.
+    """
+    if not _RESULT_CACHE_ENABLED:
+        return
+    with _result_cache_lock:
+        _result_cache[key] = [dict(plate) for plate in result]
+
+
+# Délai, en secondes, suggéré aux clients (en-tête ``Retry-After``)
+# lorsque le modèle n'est pas encore chargé.
+MODEL_RETRY_AFTER = 10
+
+# Clé de tri des plaques détectées par score de confiance
+# (``itemgetter`` est implémenté en C, sans appel de lambda par plaque).
+_BY_CONFIDENCE = itemgetter("confidence")
+
+# Signature des fichiers JPEG (marqueur SOI).
+_JPEG_MAGIC = b"\xff\xd8"
+
+# Décodeur libjpeg-turbo, instancié au premier décodage JPEG par
+# ``_get_turbojpeg``. ``False`` si PyTurboJPEG ou la bibliothèque
+# ``libturbojpeg`` est indisponible : OpenCV est alors utilisé.
+_turbojpeg = None
+_turbojpeg_lock = threading.Lock()
+
+
+def _get_turbojpeg():
+    """
+    Retourner le décodeur TurboJPEG partagé, ou ``None`` s'il est indisponible.
+
+    L'import et le chargement de ``libturbojpeg`` ne sont tentés qu'une
+    seule fois par processus.
+
+    Returns:
+        TurboJPEG | None: Décodeur libjpeg-turbo.
+    """
+    global _turbojpeg
+    if _turbojpeg is None:
+        with _turbojpeg_lock:
+            if _turbojpeg is None:
+                try:
+                    from turbojpeg import TurboJPEG
+
+                    _turbojpeg = TurboJPEG()
+                except (ImportError, OSError, RuntimeError) as e:
+                    logger.warning("TurboJPEG indisponible, décodage via OpenCV: %s", e)
+                    _turbojpeg = False
+    return _turbojpeg or None
+
+
+# Balise EXIF ``Orientation`` et transformations à appliquer à l'image
+# décodée pour chacune de ses valeurs (2 à 8), identiques à celles
+# appliquées par ``cv2.imdecode`` : transposition, puis symétrie
+# horizontale (1), verticale (0) ou les deux (-1).
+_EXIF_ORIENTATION_TAG = 0x0112
+_EXIF_TRANSFORMS = {
+    2: (False, 1),
+    3: (False, -1),
+    4: (False, 0),
+    5: (True, None),
+    6: (True, 1),
+    7: (True, -1),
+    8: (True, 0),
+}
+
+
+def _exif_orientation(data: bytes) -> int:
+    """
+    Lire la balise EXIF ``Orientation`` d'un JPEG sans le décoder.
+
+    Parcourt les segments de l'en-tête jusqu'au segment APP1 ``Exif``,
+    puis les entrées du premier répertoire (IFD0) de la structure TIFF
+    qu'il contient.
+
+    Args:
+        data (bytes): Données binaires du JPEG.
+
+    Returns:
+        int: Valeur de la balise (1 à 8), ``1`` si elle est absente ou
+            si l'en-tête est illisible.
+    """
+    pos = 2
+    while pos + 4 <= len(data) and data[pos] == 0xFF:
+        marker = data[pos + 1]
+        # Début des données compressées (SOS) ou fin d'image (EOI).
+        if marker in (0xDA, 0xD9):
+            break
+        length = int.from_bytes(data[pos + 2:pos + 4], "big")
+        if marker == 0xE1 and data[pos + 4:pos + 10] == b"Exif\0\0":
+            tiff = pos + 10
+            end = pos + 2 + length
+            order = {b"II": "little", b"MM": "big"}.get(data[tiff:tiff + 2])
+            if order is None:
+                return 1
+            ifd = tiff + int.from_bytes(data[tiff + 4:tiff + 8], order)
+            if ifd + 2 > end:
+                return 1
+            count = int.from_bytes(data[ifd:ifd + 2], order)
+            for entry in range(ifd + 2, min(ifd + 2 + 12 * count, end - 11), 12):
+                if int.from_bytes(data[entry:entry + 2], order) == _EXIF_ORIENTATION_TAG:
+                    orientation = int.from_bytes(data[entry + 8:entry + 10], order)
+                    return orientation if orientation in _EXIF_TRANSFORMS else 1
+            return 1
+        pos += 2 + length
+    return 1
+
+
+def _apply_exif_orientation(image: np.ndarray, orientation: int) -> np.ndarray:
+    """
+    Redresser une image décodée selon sa balise EXIF ``Orientation``.
+
+    Args:
+        image (np.ndarray): Image décodée, telle que stockée dans le JPEG.
+        orientation (int): Valeur de la balise (1 à 8).
+
+    Returns:
+        np.ndarray: Image dans le sens d'affichage.
+    """
+    transform = _EXIF_TRANSFORMS.get(orientation)
+    if transform is None:
+        return image
+    transpose, flip_code = transform
+    if transpose:
+        image = cv2.transpose(image)
+    if flip_code is not None:
+        image = cv2.flip(image, flip_code)
+    return image
+
+
+class ModelNotLoadedError(RuntimeError):
+    """
+    Prédiction demandée alors que le pipeline n'est pas chargé.
+
+    Distincte des ``RuntimeError`` levées par PyTorch ou ONNX Runtime
+    pendant l'inférence (mémoire CUDA épuisée, dimensions invalides),
+    qui sont de vraies erreurs et non une indisponibilité temporaire.
+    """
+
 
 class PlatePredictor:
     """
@@ -59,6 +298,24 @@ class PlatePredictor:
         """
         self.pipeline = None
         self._is_loading = False
+        # Le pipeline est appelé depuis plusieurs threads : ces
+        # verrous sérialisent les appels à chacun des modèles YOLO et
+        # EasyOCR, qui ne sont pas garantis thread-safe, tout en
+        # permettant à la détection et à l'OCR de s'exécuter en parallèle
+        # sur des lots différents.
+        self._detect_lock = threading.Lock()
+        self._ocr_lock = threading.Lock()
+        # File de regroupement des appels concurrents à ``predict_async`` :
+        # détection par lots dans ``MODEL_EXECUTOR``, puis OCR dans
+        # ``OCR_EXECUTOR``.
+        self.batch_queue = AsyncBatchQueue(
+            self._detect_batch,
+            max_batch_size=settings.INFERENCE_BATCH_SIZE,
+            max_wait_time=settings.INFERENCE_BATCH_WAIT_MS / 1000,
+            executor=MODEL_EXECUTOR,
+            finalizer=self._read_batch,
+            finalizer_executor=OCR_EXECUTOR,
+        )
 
     def load_model(self, blocking: bool = False) -> bool:
         """
@@ -71,11 +328,6 @@ class PlatePredictor:
         Returns:
             bool: ``True`` si le chargement est déclenché ou déjà actif.
         """
-        import threading
-        import logging
-
-        logger = logging.getLogger(__name__)
-
         if self.pipeline is not None:
             logger.info("Modele deja charge, aucun rechargement necessaire")
             return True
@@ -84,14 +336,31 @@ class PlatePredictor:
             logger.info("Chargement du modele deja en cours")
             return True
 
+        # L'indicateur est levé avant le démarrage du thread : entre
+        # l'appel et le début du chargement, ``/health/model`` ne doit pas
+        # rapporter un échec, et un second appel ne doit pas relancer le
+        # chargement.
+        self._is_loading = True
+
         def _load():
             try:
-                self._is_loading = True
                 logger.info("⏳ Chargement du modèle...")
-                self.pipeline = LPRPipeline()
+                pipeline = LPRPipeline()
+                # Modèle exporté avec un lot statique : les requêtes ne
+                # sont plus regroupées au-delà de ce que le détecteur
+                # accepte (voir ``LPRPipeline._warmup``).
+                max_batch = pipeline.max_batch_size
+                if max_batch is not None and max_batch < self.batch_queue.max_batch_size:
+                    logger.warning(
+                        "Lots de détection limités à %d image(s) par le modèle (INFERENCE_BATCH_SIZE=%d)",
+                        max_batch,
+                        settings.INFERENCE_BATCH_SIZE,
+                    )
+                    self.batch_queue.max_batch_size = max_batch
+                self.pipeline = pipeline
                 logger.info("✅ Modèle chargé avec succès")
             except Exception as e:
-                logger.error(f"❌ Erreur chargement modèle: {e}")
+                logger.error("❌ Erreur chargement modèle: %s", e)
                 self.pipeline = None
             finally:
                 self._is_loading = False
@@ -117,76 +386,214 @@ class PlatePredictor:
         """
         return self.pipeline is not None
 
-    def predict(self, image_bytes: bytes) -> dict:
+    def is_loading(self) -> bool:
         """
-        Détecter et lire une plaque d'immatriculation à partir de bytes.
+        Vérifier si un chargement du pipeline est en cours.
 
-        Décode les données binaires de l'image en matrice OpenCV, puis
-        exécute le pipeline complet de reconnaissance de plaques
-        (détection YOLO + lecture OCR). Si plusieurs plaques sont
-        détectées, le résultat ayant le score de confiance le plus élevé
-        est retourné.
+        Returns:
+            bool: ``True`` si ``load_model`` est en cours d'exécution.
+        """
+        return self._is_loading
+
+    @staticmethod
+    def _decode(image_bytes: bytes) -> np.ndarray:
+        """
+        Décoder les données binaires d'une image en matrice BGR.
 
         Args:
-            image_bytes (bytes): Données binaires de l'image soumise
-                pour la détection (formats supportés : JPEG, PNG, BMP,
-                et tout format pris en charge par ``cv2.imdecode``).
+            image_bytes (bytes): Données binaires de l'image soumise.
 
         Returns:
-            dict: Dictionnaire contenant les clés suivantes :
-                - ``plate_text`` (str | None) : Texte de la plaque
-                  d'immatriculation détectée, ou ``None`` si aucune
-                  plaque n'a été reconnue.
-                - ``confidence`` (float) : Score de confiance de la
-                  détection, compris entre 0.0 et 1.0, arrondi à
-                  4 décimales. Vaut ``0.0`` si aucune plaque n'est
-                  détectée.
-                - ``bounding_box`` (None) : Coordonnées de la boîte
-                  englobante de la plaque. Actuellement ``None`` car
-                  ``LPRPipeline`` ne retourne pas les bounding boxes
-                  finales.
+            np.ndarray: Image décodée au format BGR.
 
         Raises:
-            RuntimeError: Si le pipeline n'est pas chargé en mémoire
-                (``is_loaded()`` retourne ``False``).
-            ValueError: Si les données binaires fournies ne peuvent pas
-                être décodées en image valide par OpenCV.
+            ValueError: Si les données ne peuvent pas être décodées en
+                image valide.
         """
-        if not self.is_loaded():
-            raise RuntimeError("Modèle non chargé")
-
-        # Décodage de l'image : conversion des bytes bruts en tableau
-        # NumPy uint8, puis décodage en matrice BGR via OpenCV.
+        # Les JPEG, cas le plus courant, sont décodés par libjpeg-turbo
+        # (IDCT et conversion de couleurs vectorisées), plus rapide que
+        # le décodage d'OpenCV. Un JPEG refusé par TurboJPEG est confié
+        # à OpenCV, qui décide de sa validité. TurboJPEG ignore la
+        # balise EXIF ``Orientation`` qu'applique ``cv2.imdecode`` : les
+        # photos prises en portrait sont redressées après décodage.
+        if image_bytes[:2] == _JPEG_MAGIC:
+            turbojpeg = _get_turbojpeg()
+            if turbojpeg is not None:
+                try:
+                    # Si ``DECODE_REDUCE_MIN_SIDE`` est activé, les photos
+                    # très haute résolution sont décodées directement à
+                    # mi-résolution (IDCT réduite), crops de plaque
+                    # compris.
+                    width, height, _, _ = turbojpeg.decode_header(image_bytes)
+                    reduce = 0 < settings.DECODE_REDUCE_MIN_SIDE <= min(width, height)
+                    image = turbojpeg.decode(
+                        image_bytes,
+                        pixel_format=TJPF_BGR,
+                        scaling_factor=(1, 2) if reduce else None,
+                    )
+                    return _apply_exif_orientation(image, _exif_orientation(image_bytes))
+                except (OSError, ValueError):
+                    pass
+
+        # Autres formats : ``np.frombuffer`` crée une vue sans copie sur
+        # les bytes bruts, décodée en matrice BGR par OpenCV.
         nparr = np.frombuffer(image_bytes, np.uint8)
         image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
 
         if image is None:
             raise ValueError("Image invalide")
+        return image
 
-        # Exécution du pipeline complet de reconnaissance : détection
-        # YOLO des plaques puis lecture OCR des caractères.
-        results = self.pipeline.run(image)
+    @staticmethod
+    def _plate_results(results: list) -> list:
+        """
+        Construire la réponse de prédiction à partir des plaques détectées.
+
+        Args:
+            results (list): Plaques retournées par ``LPRPipeline`` pour
+                une image.
 
+        Returns:
+            list: Réponse au format décrit dans ``predict_async``.
+        """
         if not results:
-            return {
-                "plate_text": None,
-                "confidence": 0.0,
-                "bounding_box": None,
-            }
+            return []
 
         # Sélection du meilleur résultat parmi les plaques détectées,
-        # en se basant sur le score de confiance le plus élevé.
-        best = max(results, key=lambda r: r["confidence"])
-
-        return {
-            "plate_text": best["plate"] if best["plate"] else None,
-            "confidence": round(best["confidence"], 4),
+        # en se basant sur le score de confiance le plus élevé. Une
+        # plaque localisée mais illisible ne produit aucun résultat.
+        best = max(results, key=_BY_CONFIDENCE)
+        if not best["plate"]:
+            return []
+
+        return [{
+            "plate_text": best["plate"],
+            # Arrondi à 4 décimales par mise à l'échelle entière (la
+            # confiance est positive), sans passer par ``round``.
+            "confidence": int(best["confidence"] * 10000 + 0.5) / 10000,
             "bounding_box": None,  # LPRPipeline ne retourne pas les bbox finales
-        }
+        }]
+
+    def _run(self, image_bytes: bytes) -> list:
+        """
+        Décoder une image et exécuter le pipeline complet sur celle-ci.
+
+        Args:
+            image_bytes (bytes): Données binaires de l'image soumise.
+
+        Returns:
+            list: Plaques détectées par ``LPRPipeline``.
+
+        Raises:
+            ValueError: Si l'image ne peut pas être décodée.
+        """
+        image = self._decode(image_bytes)
+
+        # Exécution du pipeline complet de reconnaissance : détection
+        # YOLO des plaques puis lecture OCR des caractères.
+        return self._read_batch(self._detect_batch([image]))[0]
+
+    def _detect_batch(self, images: list) -> list:
+        """
+        Étage de détection : localiser les plaques sur un lot d'images.
+
+        Appelée par ``batch_queue`` dans ``MODEL_EXECUTOR``.
+
+        Args:
+            images (list): Images BGR décodées.
+
+        Returns:
+            list: Détections de chaque image, dans l'ordre, à transmettre
+                à ``_read_batch``.
+        """
+        with self._detect_lock:
+            return self.pipeline.detect_batch(images)
+
+    def _read_batch(self, detections: list) -> list:
+        """
+        Étage OCR : lire le texte des plaques détectées sur un lot.
+
+        Appelée par ``batch_queue`` dans ``OCR_EXECUTOR``.
+
+        Args:
+            detections (list): Détections retournées par ``_detect_batch``.
+
+        Returns:
+            list: Plaques lues pour chaque image, dans l'ordre.
+        """
+        with self._ocr_lock:
+            return self.pipeline.read_batch(detections)
+
+    async def predict_async(self, image_bytes: bytes) -> list:
+        """
+        Exécuter une prédiction sans bloquer la boucle d'événements.
+
+        Variante asynchrone destinée aux endpoints ``async def``. Le
+        résultat est d'abord recherché dans le cache en mémoire, puis
+        dans le cache Redis partagé (``app.redis_cache``) s'il est
+        configuré. En cas d'absence, si la file ``batch_queue`` est
+        démarrée, l'image est décodée dans un thread puis soumise à la
+        file, qui la regroupe avec les requêtes concurrentes en un seul
+        appel au pipeline. Sinon, l'inférence est exécutée directement
+        dans ``MODEL_EXECUTOR``. Le résultat est mémorisé dans les deux
+        niveaux de cache.
+
+        Si plusieurs plaques sont détectées, seul le résultat ayant le
+        score de confiance le plus élevé est retourné.
+
+        Args:
+            image_bytes (bytes): Données binaires de l'image soumise
+                (formats supportés : JPEG, PNG, BMP, et tout format pris
+                en charge par ``cv2.imdecode``).
+
+        Returns:
+            list: Liste vide si aucune plaque n'a été lue, sinon liste
+                d'un dictionnaire contenant les clés suivantes :
+                - ``plate_text`` (str) : Texte de la plaque
+                  d'immatriculation reconnue.
+                - ``confidence`` (float) : Score de confiance de la
+                  détection, compris entre 0.0 et 1.0, arrondi à
+                  4 décimales.
+                - ``bounding_box`` (None) : Coordonnées de la boîte
+                  englobante de la plaque. Actuellement ``None`` car
+                  ``LPRPipeline`` ne retourne pas les bounding boxes
+                  finales.
+
+        Raises:
+            ModelNotLoadedError: Si le pipeline n'est pas chargé en
+                mémoire.
+            ValueError: Si l'image ne peut pas être décodée.
+        """
+        if not self.is_loaded():
+            raise ModelNotLoadedError("Modèle non chargé")
+
+        # ``hashlib`` libère le GIL : l'empreinte d'une photo de
+        # plusieurs mégaoctets est calculée hors de la boucle.
+        key = await asyncio.to_thread(_image_digest, image_bytes)
+        cached = _cached_result(key)
+        if cached is not None:
+            return cached
+
+        cached = await redis_cache.get_result(key)
+        if cached is not None:
+            _store_result(key, cached)
+            return cached
+
+        if self.batch_queue.is_running():
+            image = await asyncio.to_thread(self._decode, image_bytes)
+            results = await self.batch_queue.add_request(image)
+        else:
+            loop = asyncio.get_running_loop()
+            results = await loop.run_in_executor(MODEL_EXECUTOR, self._run, image_bytes)
+
+        result = self._plate_results(results)
+        _store_result(key, result)
+        await redis_cache.set_result(key, result)
+        return result
 
 
 # Instance singleton globale du prédicteur, partagée par l'ensemble
 # de l'application FastAPI. Le chargement du modèle est déclenché
 # lors de l'événement de démarrage de l'application via
-# ``plate_predictor.load_model()`` dans ``app.main.startup_event``.
+# ``plate_predictor.load_model()`` dans ``app.main.lifespan``.
 plate_predictor = PlatePredictor()
\ No newline at end of file
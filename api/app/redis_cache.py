@@ -0,0 +1,127 @@
+"""
+redis_cache.py — Cache Redis partagé des résultats de prédiction de l'API SnapTaPlaque.
+
+Le cache en mémoire de ``app.predictor`` est propre à chaque processus :
+il est perdu au recyclage d'un worker Gunicorn et n'est pas partagé
+entre les workers ni entre les instances de l'API. Ce module ajoute un
+second niveau de cache, stocké dans Redis et indexé par la même
+empreinte du contenu de l'image, consulté après un échec du cache en
+mémoire. Les clés incluent aussi une empreinte du modèle et des réglages
+de reconnaissance : un changement de modèle invalide les résultats
+mémorisés par toutes les instances.
+
+Le cache Redis est optionnel : il n'est actif que si
+``settings.REDIS_URL`` est renseigné. Toute erreur Redis (serveur
+injoignable, délai dépassé) est journalisée puis traitée comme une
+absence de résultat en cache : la prédiction n'échoue jamais à cause
+du cache.
+
+Composants exposés :
+    - ``connect``    — Crée le client Redis (appelé au démarrage).
+    - ``close``      — Ferme le client Redis (appelé à l'arrêt).
+    - ``get_result`` — Retourne le résultat mémorisé pour une empreinte.
+    - ``set_result`` — Mémorise un résultat avec la durée de vie
+      ``settings.PREDICTION_REDIS_TTL``.
+
+Version : 1.0.0
+"""
+
+import logging
+from typing import Optional
+
+import orjson
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Préfixe des clés Redis, pour partager l'instance Redis avec d'autres
+# usages sans collision. Il inclut une empreinte du modèle et des
+# réglages de reconnaissance (``model_fingerprint``) et du décodage :
+# après un changement de modèle ou de réglages, les résultats produits
+# par l'ancienne configuration ne sont plus servis et expirent d'eux-mêmes.
+# Calculé par ``connect`` : l'empreinte est définie dans
+# ``app.model.lpr_engine``, dont l'import charge la pile ML (OpenCV,
+# PyTorch), inutile aux autres importateurs de ce module (migrations
+# Alembic).
+_key_prefix = b""
+
+# Client ``redis.asyncio.Redis``, créé par ``connect``. ``None`` si le
+# cache Redis est désactivé ou n'a pas encore été initialisé.
+_client = None
+
+
+async def connect() -> None:
+    """
+    Créer le client Redis si ``settings.REDIS_URL`` est renseigné.
+
+    La connexion elle-même est établie à la première commande ; un
+    serveur injoignable au démarrage n'empêche pas l'API de démarrer.
+    """
+    global _client, _key_prefix
+    if not settings.REDIS_URL or _client is not None:
+        return
+
+    import redis.asyncio as redis
+    from app.model.lpr_engine import model_fingerprint
+
+    _key_prefix = b"snaptaplaque:prediction:%s:%d:" % (
+        model_fingerprint().encode(),
+        settings.DECODE_REDUCE_MIN_SIDE,
+    )
+
+    # Délais courts : une consultation du cache ne doit jamais coûter
+    # plus cher que l'inférence qu'elle permet d'éviter.
+    _client = redis.Redis.from_url(
+        settings.REDIS_URL,
+        socket_connect_timeout=0.5,
+        socket_timeout=0.5,
+    )
+    logger.info("✅ Cache Redis des prédictions activé")
+
+
+async def close() -> None:
+    """
+    Fermer le client Redis et libérer ses connexions.
+    """
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+async def get_result(key: bytes) -> Optional[list]:
+    """
+    Retourner le résultat mémorisé dans Redis pour une empreinte d'image.
+
+    Args:
+        key (bytes): Empreinte du contenu de l'image.
+
+    Returns:
+        Optional[list]: Résultats de prédiction, ou ``None`` si absents,
+            si le cache Redis est désactivé ou en cas d'erreur Redis.
+    """
+    if _client is None:
+        return None
+    try:
+        payload = await _client.get(_key_prefix + key)
+    except Exception as e:
+        logger.warning("Cache Redis indisponible (lecture): %s", e)
+        return None
+    return orjson.loads(payload) if payload is not None else None
+
+
+async def set_result(key: bytes, result: list) -> None:
+    """
+    Mémoriser dans Redis le résultat de prédiction d'une image.
+
+    Args:
+        key (bytes): Empreinte du contenu de l'image.
+        result (list): Résultats de prédiction, sérialisables en JSON.
+    """
+    if _client is None:
+        return
+    try:
+        await _client.setex(_key_prefix + key, settings.PREDICTION_REDIS_TTL, orjson.dumps(result))
+    except Exception as e:
+        logger.warning("Cache Redis indisponible (écriture): %s", e)
@@ -15,8 +15,12 @@ ils sont tous accessibles publiquement sans token JWT.
 Version : 1.0.0
 """
 
-from fastapi import APIRouter
-from app.config import settings
+from fastapi import APIRouter, Depends
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.exc import SQLAlchemyError
+from app.config import Settings, get_settings
+from app.database import ping, pool_stats
+from app.predictor import MODEL_RETRY_AFTER, plate_predictor
 from app.schemas import RGPDRequest
 
 router = APIRouter()
@@ -29,7 +33,7 @@ router = APIRouter()
 # version spécifique du contrat d'API.
 
 @router.get("/", include_in_schema=False)
-async def root():
+async def root(settings: Settings = Depends(get_settings)):
     """
     Endpoint racine de l'API.
 
@@ -49,6 +53,10 @@ async def root():
 
     Aucune authentification n'est requise pour accéder à cet endpoint.
 
+    Args:
+        settings (Settings): Configuration de l'application, injectée
+            par la dépendance mémoïsée ``get_settings``.
+
     Returns:
         dict: Dictionnaire contenant les clés suivantes :
             - ``message`` (str) : Message indiquant que
@@ -68,7 +76,7 @@ async def root():
 # ==================== Information Version ====================
 
 @router.get("/versions")
-async def list_versions():
+async def list_versions(settings: Settings = Depends(get_settings)):
     """
     Lister les versions disponibles de l'API SnapTaPlaque.
 
@@ -96,6 +104,10 @@ async def list_versions():
 
     Aucune authentification n'est requise pour accéder à cet endpoint.
 
+    Args:
+        settings (Settings): Configuration de l'application, injectée
+            par la dépendance mémoïsée ``get_settings``.
+
     Returns:
         dict: Dictionnaire contenant les clés suivantes :
             - ``versions`` (dict) : Liste de dictionnaires, chacun
@@ -250,7 +262,7 @@ async def privacy_policy(
     return content
 
 @router.get("/health")
-async def health_check():
+async def health_check(settings: Settings = Depends(get_settings)):
     """
     Vérification de l'état de santé de l'API SnapTaPlaque.
 
@@ -264,7 +276,12 @@ async def health_check():
     dépendances externes (base de données, services tiers) afin
     de garantir un temps de réponse minimal. Pour un diagnostic
     plus complet incluant l'état des dépendances, un endpoint
-    /health/ready pourrait être ajouté ultérieurement.
+    /health/ready pourrait être ajouté ultérieurement. L'état de
+    chargement du modèle est exposé par ``GET /health/model``.
+
+    Args:
+        settings (Settings): Configuration de l'application, injectée
+            par la dépendance mémoïsée ``get_settings``.
 
     Returns:
         dict: Dictionnaire contenant les clés suivantes :
@@ -276,4 +293,63 @@ async def health_check():
     return {
         "status": "healthy",
         "version": settings.API_VERSION,
-    }
\ No newline at end of file
+    }
+
+@router.get("/health/model")
+async def model_health_check():
+    """
+    Vérification de l'état de chargement du modèle de reconnaissance.
+
+    Le modèle est chargé en arrière-plan au démarrage de l'application :
+    ``GET /health`` répond dès que le serveur accepte des connexions,
+    alors que les prédictions ne sont possibles qu'une fois le chargement
+    terminé. Cet endpoint public permet aux orchestrateurs (sonde de
+    disponibilité Kubernetes, load balancer) d'attendre que l'instance
+    puisse traiter des prédictions.
+
+    Returns:
+        ORJSONResponse: Réponse HTTP 200 si le modèle est chargé, HTTP 503
+            avec un en-tête ``Retry-After`` sinon. Le corps contient les
+            clés suivantes :
+            - ``loaded`` (bool) : ``True`` si le modèle est chargé.
+            - ``loading`` (bool) : ``True`` si un chargement est en
+              cours. ``loaded`` et ``loading`` tous deux à ``False``
+              indiquent un échec du chargement.
+    """
+    loaded = plate_predictor.is_loaded()
+    content = {"loaded": loaded, "loading": plate_predictor.is_loading()}
+    if loaded:
+        return ORJSONResponse(content=content)
+    return ORJSONResponse(
+        status_code=503,
+        content=content,
+        headers={"Retry-After": str(MODEL_RETRY_AFTER)},
+    )
+
+
+@router.get("/health/db")
+def database_health_check():
+    """
+    Vérification de la disponibilité de la base de données.
+
+    Exécute un ``SELECT 1`` sur une connexion du pool et retourne
+    l'occupation du pool de connexions (voir ``app.database.pool_stats``),
+    afin de diagnostiquer un pool sous-dimensionné (requêtes en attente
+    d'une connexion libre) sans accès direct au serveur. Endpoint
+    synchrone : il est exécuté dans le pool de threads de FastAPI.
+
+    Returns:
+        ORJSONResponse: Réponse HTTP 200 si la base répond, HTTP 503
+            sinon. Le corps contient les clés suivantes :
+            - ``database`` (str) : ``"up"`` ou ``"down"``.
+            - ``pool`` (dict) : Occupation du pool de connexions.
+    """
+    try:
+        ping()
+        status_code, database = 200, "up"
+    except SQLAlchemyError:
+        status_code, database = 503, "down"
+    return ORJSONResponse(
+        status_code=status_code,
+        content={"database": database, "pool": pool_stats()},
+    )
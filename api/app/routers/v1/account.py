@@ -46,10 +46,17 @@ Version : 1.0.0
 
 from fastapi import APIRouter, Depends, HTTPException, status, Request, File, UploadFile , Response
 from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
 from app.database import get_db, User, Prediction, UserPicture
-from app import crud, schemas
-from app.auth import create_access_token, verify_password, get_current_active_user
+from app import crud, schemas, stats_cache
+from app.auth import (
+    create_access_token,
+    verify_password,
+    dummy_verify_password,
+    get_current_active_user,
+    invalidate_cached_user,
+)
 from app.limiter import limiter
 
 # Instance du routeur FastAPI pour les endpoints d'authentification.
@@ -60,9 +67,46 @@ router = APIRouter()
 # ================== LOGIN ==================
 
 
+def _authenticate(db: Session, username: str, password: str) -> User | None:
+    """
+    Vérifier un couple identifiant / mot de passe.
+
+    Fonction synchrone regroupant la lecture de l'utilisateur et la
+    vérification bcrypt, destinée à être exécutée dans le pool de
+    threads : la dérivation de clé bcrypt (plusieurs dizaines de
+    millisecondes) ne bloque ainsi jamais la boucle d'événements.
+
+    Args:
+        db (Session): Session SQLAlchemy active.
+        username (str): Nom d'utilisateur soumis.
+        password (str): Mot de passe en clair soumis.
+
+    Returns:
+        User | None: Utilisateur authentifié, ou ``None`` si le nom
+            d'utilisateur est inconnu ou le mot de passe erroné.
+    """
+    user = crud.get_user_by_username(db, username)
+
+    # Restitution de la connexion au pool avant bcrypt : elle n'est
+    # ainsi détenue que le temps du SELECT, et non pendant les
+    # centaines de millisecondes de la dérivation de clé. L'instance
+    # détachée conserve les colonnes déjà chargées.
+    db.close()
+
+    # Un nom d'utilisateur inconnu consomme le même temps bcrypt qu'un
+    # mot de passe erroné afin de ne pas révéler l'existence du compte.
+    if user is None:
+        dummy_verify_password(password)
+        return None
+
+    if not verify_password(password, user.hashed_password):
+        return None
+    return user
+
+
 @router.post("/login", response_model=schemas.Token)
 @limiter.limit("10/minute")
-def login(
+async def login(
     request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db),
@@ -97,9 +141,12 @@ def login(
         HTTPException (401): Si le nom d'utilisateur n'existe pas ou si
             le mot de passe fourni ne correspond pas au hash stocké.
     """
-    user = crud.get_user_by_username(db, form_data.username)
+    # Lecture en base et vérification bcrypt dans le pool de threads.
+    user = await run_in_threadpool(
+        _authenticate, db, form_data.username, form_data.password
+    )
 
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Identifiants incorrects",
@@ -118,7 +165,7 @@ def login(
 
 @router.post("/register", response_model=schemas.UserResponse)
 @limiter.limit("5/minute")
-def register(
+async def register(
     request: Request,
     user: schemas.UserCreate,
     db: Session = Depends(get_db),
@@ -126,8 +173,9 @@ def register(
     """
     Inscrire un nouvel utilisateur sur la plateforme SnapTaPlaque.
 
-    Crée un compte utilisateur après validation du consentement RGPD
-    et vérification de l'unicité de l'adresse email. Le mot de passe
+    Crée un compte utilisateur après validation du consentement RGPD.
+    L'unicité de l'adresse email et du nom d'utilisateur est garantie
+    atomiquement par la base lors de l'insertion. Le mot de passe
     est haché via bcrypt avant persistance en base de données (voir
     ``crud.create_user``). La date du consentement RGPD est horodatée
     automatiquement lors de la création du compte.
@@ -170,8 +218,8 @@ def register(
 
     Raises:
         HTTPException (400): Si le consentement RGPD n'est pas donné
-            (``gdpr_consent == False``) ou si l'adresse email est déjà
-            associée à un compte existant.
+            (``gdpr_consent == False``) ou si l'adresse email ou le nom
+            d'utilisateur est déjà associé à un compte existant.
         HTTPException (429): Si la limite de 5 inscriptions par minute
             par adresse IP est dépassée (rate limiting).
     """
@@ -182,14 +230,23 @@ def register(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Vous devez accepter la politique de confidentialité (RGPD).",
         )
-    # Vérification de l'unicité de l'adresse email pour éviter les
-    # doublons en base de données.
-    db_user = crud.get_user_by_email(db, email=user.email)
-    if db_user:
-        raise HTTPException(status_code=400, detail="Email déjà enregistré")
     # Création de l'utilisateur en base avec hachage du mot de passe
     # et horodatage du consentement RGPD (voir crud.create_user).
-    return crud.create_user(db=db, user=user)
+    # L'unicité de l'email et du nom d'utilisateur est vérifiée par la
+    # base au moment de l'insertion : ``None`` signale un doublon.
+    # Le hachage bcrypt s'exécute dans le pool de threads.
+    db_user = await run_in_threadpool(crud.create_user, db=db, user=user)
+    if db_user is None:
+        raise HTTPException(
+            status_code=400,
+            detail="Email ou nom d'utilisateur déjà enregistré",
+        )
+    # Un compte supprimé portant le même nom d'utilisateur pourrait
+    # encore figurer dans le cache d'authentification ; la liste et les
+    # statistiques d'administration en cache sont périmées.
+    invalidate_cached_user(db_user.username)
+    stats_cache.invalidate()
+    return db_user
 
 
 
@@ -327,6 +384,8 @@ def delete_my_account(
 
     db.query(User).filter(User.id == current_user.id).delete()
     db.commit()
+    invalidate_cached_user(current_user.username)
+    stats_cache.invalidate()
 
     return {"message": "Compte et données personnelles supprimés définitivement."}
 
@@ -353,13 +412,13 @@ def get_profile_picture(
     return Response(content=user_picture.picture, media_type="image/jpeg")
 
 @router.post("/me/change-profile-picture")
-async def change_profile_picture(
+def change_profile_picture(
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db),
     file: UploadFile = File(...),
 ):
     # Lecture des bytes de l'image
-    image_bytes = await file.read()
+    image_bytes = file.file.read()
     
     user_picture = db.query(UserPicture).filter(UserPicture.user_id == current_user.id).first()
 
@@ -12,15 +12,23 @@ Endpoints exposés :
     - ``GET /stats``  — Statistiques globales de la plateforme (nombre
       d'utilisateurs total, actifs, administrateurs).
 
+Les réponses sont mises en cache quelques secondes (voir
+``app.stats_cache``) et accompagnées d'un en-tête ``Cache-Control``
+privé, afin qu'un tableau de bord rafraîchi à intervalle fixe ne
+relance pas un parcours complet des tables à chaque appel.
+
 Ces endpoints sont montés sous le préfixe ``/admin`` par le routeur
 principal de l'application (voir ``app/main.py``).
 
 Version : 1.0.0
 """
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
 
+from app import stats_cache
+from app.config import settings
 from app.database import get_db
 from app.dependencies import get_current_admin_user
 from app.crud import get_all_users, get_global_stats
@@ -31,6 +39,29 @@ from app.schemas import UserResponse
 # le préfixe "/admin" et le tag "Admin" pour la documentation OpenAPI.
 router = APIRouter()
 
+# En-tête ``Cache-Control`` des réponses d'administration : ``private``
+# interdit la mise en cache par un proxy ou un CDN partagé, ces données
+# n'étant accessibles qu'aux administrateurs authentifiés.
+CACHE_CONTROL = f"private, max-age={settings.ADMIN_CACHE_TTL}"
+
+# Adaptateur Pydantic de la liste des utilisateurs, construit une seule
+# fois à l'import : son validateur et son sérialiseur (pydantic-core)
+# ne sont pas reconstruits à chaque requête.
+_USER_LIST = TypeAdapter(list[UserResponse])
+
+
+def _encode_users(db: Session) -> bytes:
+    """
+    Valider et encoder en JSON la liste des utilisateurs.
+
+    Args:
+        db (Session): Session SQLAlchemy active.
+
+    Returns:
+        bytes: Corps JSON de la réponse de ``list_users``.
+    """
+    return _USER_LIST.dump_json(_USER_LIST.validate_python(get_all_users(db)))
+
 
 @router.get("/users", response_model=list[UserResponse])
 def list_users(
@@ -41,10 +72,20 @@ def list_users(
     Récupérer la liste de tous les utilisateurs inscrits.
 
     Endpoint réservé aux administrateurs. Retourne l'ensemble des comptes
-    utilisateurs enregistrés dans la base de données, sérialisés selon
-    le schéma ``UserResponse`` (les champs sensibles tels que
+    utilisateurs enregistrés dans la base de données, limités aux champs
+    du schéma ``UserResponse`` (les champs sensibles tels que
     ``hashed_password`` sont exclus de la réponse).
 
+    La liste peut compter plusieurs milliers d'entrées : les lignes
+    lues en base sont validées et encodées en une seule passe par
+    l'adaptateur précompilé ``_USER_LIST``, et le corps JSON obtenu est
+    retourné tel quel, sans le traitement de ``response_model``
+    (conservé pour la documentation OpenAPI).
+
+    Le corps JSON est mis en cache ``settings.ADMIN_CACHE_TTL`` secondes
+    et invalidé à chaque inscription ou suppression de compte : les
+    appels servis par le cache ne font aucun encodage.
+
     Args:
         db (Session): Session SQLAlchemy injectée automatiquement par
             la dépendance ``get_db``.
@@ -53,14 +94,22 @@ def list_users(
             si l'utilisateur n'est pas connecté ou n'est pas administrateur.
 
     Returns:
-        list[UserResponse]: Liste de tous les utilisateurs avec leurs
-            informations publiques (id, username, email, is_active, is_admin).
+        Response: Liste JSON de tous les utilisateurs avec leurs
+            informations publiques (id, username, email, is_active, is_admin),
+            accompagnée de l'en-tête ``Cache-Control``.
     """
-    return get_all_users(db)
+    body = stats_cache.get_or_compute("users", lambda: _encode_users(db))
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={"Cache-Control": CACHE_CONTROL},
+    )
 
 
 @router.get("/stats")
 def global_stats(
+    response: Response,
+    approximate: bool = False,
     db: Session = Depends(get_db),
     admin=Depends(get_current_admin_user),
 ):
@@ -74,7 +123,15 @@ def global_stats(
     Ces statistiques sont utiles pour les tableaux de bord de supervision
     et le suivi opérationnel de la plateforme.
 
+    Les statistiques sont mises en cache ``settings.ADMIN_CACHE_TTL``
+    secondes : le nombre de prédictions peut donc retarder de ce délai.
+
     Args:
+        response (Response): Réponse FastAPI, utilisée pour positionner
+            l'en-tête ``Cache-Control``.
+        approximate (bool): Retourner les estimations de PostgreSQL
+            (instantanées, mises à jour par VACUUM / ANALYZE) plutôt
+            qu'un comptage exact. Par défaut ``False``.
         db (Session): Session SQLAlchemy injectée automatiquement par
             la dépendance ``get_db``.
         admin: Utilisateur administrateur authentifié, injecté par
@@ -85,4 +142,8 @@ def global_stats(
         dict: Dictionnaire contenant les statistiques globales, typiquement
             ``total_users``, ``active_users`` et ``admin_users``.
     """
-    return get_global_stats(db)
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    return stats_cache.get_or_compute(
+        "stats-approximate" if approximate else "stats",
+        lambda: get_global_stats(db, approximate=approximate),
+    )
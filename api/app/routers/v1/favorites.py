@@ -22,7 +22,7 @@ Version : 1.0.0
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from app import crud, schemas
+from app import crud
 from app.database import get_db, User
 from app.auth import get_current_user
 from app.schemas import AllFavoritesResponse
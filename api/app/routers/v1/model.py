@@ -64,5 +64,5 @@ async def get_model_info():
             "pipeline": "LPRPipeline"
         }
     except Exception as e:
-        logger.error(f"Erreur modèle: {str(e)}")
+        logger.error("Erreur modèle: %s", e)
         raise HTTPException(status_code=500, detail="Cannot retrieve model info")
@@ -25,14 +25,19 @@ Version : 1.0.0
 """
 
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
 
+from app.config import settings
 from app.database import get_db, User
 from app.auth import get_current_active_user
-from app.crud import create_prediction, get_user_predictions, get_user_prediction_stats
-from app.predictor import plate_predictor
-from app.schemas import PlateHistory, PlateStats, PredictionHistory
+from app.crud import create_prediction, get_user_prediction_history, get_user_prediction_stats
+from app.predictor import MODEL_RETRY_AFTER, ModelNotLoadedError, plate_predictor
+from app.schemas import PlateStats, PredictionHistory
 from app.limiter import limiter
+from datetime import datetime
+from typing import Optional
 import logging
 
 # Instance du routeur FastAPI pour les endpoints de prédiction.
@@ -44,6 +49,9 @@ router = APIRouter()
 # Configuration du logger
 logger = logging.getLogger(__name__)
 
+# Taille maximale acceptée pour une image soumise, en octets.
+MAX_UPLOAD_BYTES = settings.MAX_UPLOAD_MB * 1024 * 1024
+
 # ================== PREDICT ==================
 
 
@@ -91,29 +99,63 @@ async def predict_plate(
 
     Raises:
         HTTPException (503): Si le modèle de prédiction n'a pas encore
-            été chargé en mémoire.
+            été chargé en mémoire. La réponse porte un en-tête
+            ``Retry-After``.
         HTTPException (400): Si le fichier fourni n'est pas une image
             valide exploitable par le pipeline de détection.
+        HTTPException (413): Si le fichier dépasse
+            ``settings.MAX_UPLOAD_MB`` mégaoctets.
     """
-    contents = await file.read()
-
+    # Le modèle est chargé en arrière-plan au démarrage : le client
+    # est invité à réessayer une fois le chargement terminé.
+    model_unavailable = HTTPException(
+        status_code=503,
+        detail="Modèle non chargé",
+        headers={"Retry-After": str(MODEL_RETRY_AFTER)},
+    )
     if not plate_predictor.is_loaded():
-        raise HTTPException(status_code=503, detail="Modèle non chargé")
+        raise model_unavailable
+
+    too_large = HTTPException(
+        status_code=413,
+        detail=f"Image trop volumineuse (maximum {settings.MAX_UPLOAD_MB} Mo)",
+    )
+    # Starlette a déjà reçu le fichier dans un fichier temporaire
+    # (``file.size`` connu) : les fichiers trop volumineux sont refusés
+    # avant d'être chargés en mémoire.
+    if file.size is not None and file.size > MAX_UPLOAD_BYTES:
+        raise too_large
+
+    # Lecture bornée : si la taille n'a pas été renseignée, au plus
+    # ``MAX_UPLOAD_BYTES + 1`` octets sont chargés, l'octet
+    # supplémentaire suffisant à détecter un dépassement.
+    contents = await file.read(MAX_UPLOAD_BYTES + 1)
+    if len(contents) > MAX_UPLOAD_BYTES:
+        raise too_large
+
     try:
         logger.info("Prédiction en cours...")
-        result = plate_predictor.predict(contents)
+        # Inférence dans le pool dédié (voir ``MODEL_EXECUTOR``) : la
+        # boucle d'événements reste disponible pendant le traitement.
+        results = await plate_predictor.predict_async(contents)
     except ValueError:
         raise HTTPException(status_code=400, detail="Image invalide")
+    except ModelNotLoadedError:
+        # Les autres erreurs d'inférence (``RuntimeError`` de PyTorch ou
+        # d'ONNX Runtime) ne sont pas interceptées : réponse 500 et trace
+        # journalisée, sans inviter le client à réessayer.
+        raise model_unavailable
 
 
-    results = [result] if result["plate_text"] else []
-    logger.info(result["plate_text"])
+    logger.info("%d plaque(s) détectée(s)", len(results))
 
-    prediction = create_prediction(
+    # Écriture synchrone en base déportée dans le pool de threads.
+    prediction = await run_in_threadpool(
+        create_prediction,
         db=db,
         user_id=current_user.id,
         filename=file.filename,
-        results=results
+        results=results,
     )
 
     return {
@@ -126,9 +168,11 @@ async def predict_plate(
 
 
 @router.get("/history", response_model=PredictionHistory)
-async def get_prediction_history(
+def get_prediction_history(
     skip: int = 0,
     limit: int = 100,
+    after_created_at: Optional[datetime] = None,
+    after_id: Optional[int] = None,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
@@ -136,21 +180,28 @@ async def get_prediction_history(
     Consulter l'historique des prédictions de l'utilisateur connecté.
 
     Retourne la liste des prédictions effectuées par l'utilisateur
-    authentifié, ordonnées chronologiquement. Chaque prédiction contenant
-    un ou plusieurs résultats de détection est éclatée en autant d'entrées
-    individuelles dans la réponse. Les prédictions sans détection sont
-    incluses avec des valeurs ``null`` pour ``plate_text`` et
-    ``confidence``.
-
-    La pagination est gérée via les paramètres ``skip`` et ``limit``
-    qui s'appliquent au niveau des prédictions en base (et non au niveau
-    des entrées individuelles retournées).
+    authentifié, ordonnées de la plus récente à la plus ancienne.
+    Chaque prédiction contenant un ou plusieurs résultats de détection
+    est éclatée en autant d'entrées individuelles dans la réponse. Les
+    prédictions sans détection sont incluses avec des valeurs ``null``
+    pour ``plate_text`` et ``confidence``.
+
+    La pagination s'applique au niveau des prédictions en base (et non
+    au niveau des entrées individuelles retournées). Lorsqu'une page est
+    complète, la réponse contient un ``next_cursor`` dont les valeurs
+    sont à renvoyer dans ``after_created_at`` et ``after_id`` pour
+    obtenir la page suivante. Ce mode est à privilégier à ``skip``,
+    dont le coût croît avec la profondeur de la page.
 
     Args:
         skip (int): Nombre de prédictions à ignorer depuis le début de
             la liste (offset). Par défaut ``0``.
         limit (int): Nombre maximum de prédictions à récupérer. Par
             défaut ``100``.
+        after_created_at (datetime | None): Date de création du curseur
+            de la page précédente. Par défaut ``None``.
+        after_id (int | None): Identifiant du curseur de la page
+            précédente. Par défaut ``None``.
         current_user (User): Utilisateur authentifié, injecté par
             ``get_current_active_user``. Déclenche une erreur HTTP 401
             si le token est absent, expiré ou invalide.
@@ -158,36 +209,65 @@ async def get_prediction_history(
             la dépendance ``get_db``.
 
     Returns:
-        dic[list[PlateHistory]]: Liste des entrées d'historique contenant
-            chacune ``id``, ``plate_text``, ``confidence`` et
-            ``created_at``.
+        ORJSONResponse: Corps JSON contenant ``history`` (liste des entrées
+            d'historique, chacune avec ``id``, ``plate_text``,
+            ``confidence`` et ``created_at``) et ``next_cursor``
+            (curseur de la page suivante, ou ``None``).
+
+    Raises:
+        HTTPException (400): Si un seul des deux paramètres du curseur
+            (``after_created_at``, ``after_id``) est fourni.
     """
-    predictions = get_user_predictions(db, current_user.id, skip=skip, limit=limit)
+    if (after_created_at is None) != (after_id is None):
+        raise HTTPException(
+            status_code=400,
+            detail="after_created_at et after_id doivent être fournis ensemble",
+        )
+
+    predictions = get_user_prediction_history(
+        db,
+        current_user.id,
+        skip=skip,
+        limit=limit,
+        after_created_at=after_created_at,
+        after_id=after_id,
+    )
+    # Les entrées sont construites directement sous forme de
+    # dictionnaires et renvoyées dans une ``ORJSONResponse`` : les
+    # valeurs proviennent de la base, déjà validées à l'écriture, et la
+    # revalidation par ``response_model`` (conservé pour la
+    # documentation OpenAPI) est évitée. Les clés ``null`` sont
+    # conservées, conformément au contrat de l'API.
     history = []
     for pred in predictions:
-        if pred.results and len(pred.results) > 0:
+        if pred.results:
             for result in pred.results:
-                history.append(PlateHistory(
-                    id=pred.id,
-                    plate_text=result.get("plate_text"),
-                    confidence=result.get("confidence"),
-                    created_at=pred.created_at
-                ))
+                history.append({
+                    "id": pred.id,
+                    "plate_text": result.get("plate_text"),
+                    "confidence": result.get("confidence"),
+                    "created_at": pred.created_at,
+                })
         else:
-            history.append(PlateHistory(
-                id=pred.id,
-                plate_text=None,
-                confidence=None,
-                created_at=pred.created_at
-            ))
+            history.append({
+                "id": pred.id,
+                "plate_text": None,
+                "confidence": None,
+                "created_at": pred.created_at,
+            })
+
+    next_cursor = None
+    if predictions and len(predictions) == limit:
+        last = predictions[-1]
+        next_cursor = {"created_at": last.created_at, "id": last.id}
 
-    return {"history": history}
+    return ORJSONResponse({"history": history, "next_cursor": next_cursor})
 
 # ================== STATS ==================
 
 
 @router.get("/stats", response_model=PlateStats)
-async def get_prediction_statistics(
+def get_prediction_statistics(
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
@@ -28,7 +28,7 @@ router = APIRouter()
 # ================== ENDPOINTS ==================
 
 @router.post("/info", response_model=schemas.VehicleInfoResponse)
-async def get_vehicle_info(
+def get_vehicle_info(
         license_plate: str,
         db: Session = Depends(get_db),
         current_user: User = Depends(get_current_user),
@@ -53,13 +53,13 @@ async def get_vehicle_info(
     # 1. Nettoyage de la plaque
     clean_plate = license_plate.replace('-', '').replace(' ', '').replace('"', '').upper()
     plate_formatted = f"{clean_plate[:2]}-{clean_plate[2:5]}-{clean_plate[5:]}" if len(clean_plate) == 7 else clean_plate
-    logger.info(f"Requête plaque: '{plate_formatted}' par user: {current_user.username}")
+    logger.info("Requête plaque: '%s' par user: %s", plate_formatted, current_user.username)
 
     try:
         vehicle = crud.get_vehicle_by_license_plate(db, plate_formatted)
-        print(f"Véhicule trouvé en bdd: {vehicle}")
+        logger.debug("Véhicule trouvé en bdd: %s", vehicle)
         if not vehicle:
-            logger.info(f"Véhicule '{plate_formatted}' non trouvé dans la bdd, appel de l'API Oscaro.")
+            logger.info("Véhicule '%s' non trouvé dans la bdd, appel de l'API Oscaro.", plate_formatted)
             # 2. Appel au service de récupération asynchrone
             vehicle = _fetch_vehicle_data_from_provider(plate_formatted)
 
@@ -74,21 +74,21 @@ async def get_vehicle_info(
 
         # Enregistrement de l'historique de consultation pour l'utilisateur
         crud.create_vehicle_info_history(db, current_user.id, license_plate=plate_formatted)
-        logger.info(f"Véhicule '{plate_formatted}' récupéré et sauvegardé en bdd.")
+        logger.info("Véhicule '%s' récupéré et sauvegardé en bdd.", plate_formatted)
 
         # 3. Retourne les données mappées sur le schéma Pydantic
-        print(f"Véhicule trouvé: {vehicle}")
+        logger.debug("Véhicule trouvé: %s", vehicle)
         return vehicle
 
     except HTTPException as e:
-        logger.error(f"Erreur lors de la récupération des données du véhicule: {e}")
+        logger.error("Erreur lors de la récupération des données du véhicule: %s", e)
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Erreur lors de la récupération des données du véhicule."
         )
     
 @router.get("/history", response_model=schemas.VehicleInfoHistoryResponse)
-async def get_vehicle_info_history(
+def get_vehicle_info_history(
         db: Session = Depends(get_db),
         current_user: User = Depends(get_current_user),
 ):
@@ -110,7 +110,7 @@ async def get_vehicle_info_history(
         return schemas.VehicleInfoHistoryResponse(history=history_entries)
     
     except Exception as e:
-        logger.error(f"Erreur lors de la récupération de l'historique des véhicules: {e}")
+        logger.error("Erreur lors de la récupération de l'historique des véhicules: %s", e)
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Erreur lors de la récupération de l'historique des véhicules."
@@ -19,7 +19,7 @@ Catégories de schémas :
 
 Version : 1.0.0
 """
-from pydantic import BaseModel, EmailStr, Field, field_validator
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, field_validator
 from typing import Optional, List
 from datetime import datetime
 
@@ -93,23 +93,17 @@ class TokenWithRefresh(Token):
 
     refresh_token: str
 
-    class Config:
-        """
-        Configuration interne du schéma Pydantic.
-
-        Attributes:
-            json_schema_extra (dict): Exemple de réponse intégré à la
-                documentation OpenAPI pour faciliter la compréhension
-                du format de retour.
-        """
-
-        json_schema_extra = {
+    # Exemple de réponse intégré à la documentation OpenAPI pour
+    # faciliter la compréhension du format de retour.
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "access_token": "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9...",
                 "token_type": "bearer",
                 "refresh_token": "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9..."
             }
         }
+    )
 
 
 class TokenData(BaseModel):
@@ -190,6 +184,8 @@ class PredictionResponse(BaseModel):
         ``from_attributes`` — Active la compatibilité avec les instances
         ORM SQLAlchemy, permettant de construire le schéma directement
         à partir d'un objet ``Prediction`` (anciennement ``orm_mode``).
+        ``frozen`` — Instances immuables, jamais modifiées après leur
+        construction pour la réponse.
     """
 
     id: int
@@ -198,8 +194,7 @@ class PredictionResponse(BaseModel):
     results: List[DetectionResult]
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
 
 class PlateStats(BaseModel):
@@ -244,6 +239,8 @@ class PlateHistory(BaseModel):
         ``from_attributes`` — Active la compatibilité avec les instances
         ORM SQLAlchemy, permettant de construire le schéma directement
         à partir d'un objet ``Prediction`` (anciennement ``orm_mode``).
+        ``frozen`` — Instances immuables, jamais modifiées après leur
+        construction pour la réponse.
     """
 
     id: int
@@ -251,15 +248,32 @@ class PlateHistory(BaseModel):
     confidence: Optional[float] = None
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
+
+class HistoryCursor(BaseModel):
+    """
+    Curseur de pagination de l'historique des prédictions.
+
+    Identifie la dernière prédiction d'une page ; ses valeurs sont à
+    renvoyer telles quelles dans les paramètres ``after_created_at`` et
+    ``after_id`` pour obtenir la page suivante.
+
+    Attributes:
+        created_at (datetime): Date de création de la dernière
+            prédiction de la page.
+        id (int): Identifiant de la dernière prédiction de la page.
+    """
+
+    created_at: datetime
+    id: int
 
 
 class PredictionHistory(BaseModel):
     history: List[PlateHistory] 
+    next_cursor: Optional[HistoryCursor] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True)
     
 # ---------- USER ----------
 
@@ -347,6 +361,8 @@ class UserResponse(BaseModel):
         ``from_attributes`` — Active la compatibilité avec les instances
         ORM SQLAlchemy, permettant de construire le schéma directement
         à partir d'un objet ``User`` (anciennement ``orm_mode``).
+        ``frozen`` — Instances immuables, jamais modifiées après leur
+        construction pour la réponse.
     """
 
     id: int
@@ -357,8 +373,7 @@ class UserResponse(BaseModel):
     is_admin: bool
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
 # ================== Vehicles Info ==================
 class VehicleInfoResponse(BaseModel):
@@ -384,6 +399,8 @@ class VehicleInfoResponse(BaseModel):
         ``from_attributes`` — Active la compatibilité avec les instances
         ORM SQLAlchemy, permettant de construire le schéma directement
         à partir d'un objet ``Vehicle`` (anciennement ``orm_mode``).
+        ``frozen`` — Instances immuables, jamais modifiées après leur
+        construction pour la réponse.
     """
 
     license_plate: str
@@ -392,8 +409,7 @@ class VehicleInfoResponse(BaseModel):
     info: str
     energy: str
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
 class AllFavoritesResponse(BaseModel):
     """
@@ -410,8 +426,7 @@ class AllFavoritesResponse(BaseModel):
     """
     favorites: List[VehicleInfoResponse]
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
 class VehicleInfoHistoryResponse(BaseModel):
     """
@@ -426,8 +441,7 @@ class VehicleInfoHistoryResponse(BaseModel):
     """
     history: List[VehicleInfoResponse]
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
 class RGPDRequest(BaseModel):
     """
@@ -442,5 +456,4 @@ class RGPDRequest(BaseModel):
     """
     language: str
 
-    class Config:
-        from_attributes = True
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
@@ -6,10 +6,14 @@ des mots de passe utilisateurs. Il fournit des fonctions de hachage et
 de vérification basées sur l'algorithme bcrypt, garantissant un stockage
 sécurisé des mots de passe en base de données.
 
+Les fonctions appellent directement le module C ``bcrypt``, sans passer
+par la couche d'abstraction de Passlib (sélection du schéma, analyse du
+hash, gestion des schémas obsolètes) : l'application n'utilise qu'un
+seul schéma, au format ``$2b$``.
+
 Composants exposés :
-    - ``pwd_context``         — Instance ``CryptContext`` de Passlib
-      configurée avec l'algorithme bcrypt, utilisée en interne par les
-      fonctions de hachage et de vérification.
+    - ``BCRYPT_ROUNDS``       — Facteur de coût bcrypt effectif, issu de
+      la configuration ou du calibrage au démarrage.
     - ``get_password_hash``   — Fonction générant un hash bcrypt à
       partir d'un mot de passe en clair.
     - ``verify_password``     — Fonction vérifiant qu'un mot de passe
@@ -18,15 +22,68 @@ Composants exposés :
 Version : 1.0.0
 """
 
-from passlib.context import CryptContext
+import logging
+import math
+import statistics
+import time
+
+import bcrypt
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Bornes du calibrage du facteur de coût : 10 est le plancher
+# recommandé par l'OWASP, au-delà de 14 un hachage dépasse la seconde
+# sur la plupart des serveurs.
+BCRYPT_MIN_ROUNDS = 10
+BCRYPT_MAX_ROUNDS = 14
+
+# bcrypt n'utilise que les 72 premiers octets du mot de passe ; la
+# troncature est explicite, comme le faisait Passlib.
+BCRYPT_MAX_PASSWORD_BYTES = 72
+
+
+def _encode(password: str) -> bytes:
+    """Encoder un mot de passe en UTF-8, tronqué à la limite de bcrypt."""
+    return password.encode("utf-8")[:BCRYPT_MAX_PASSWORD_BYTES]
+
+
+def _calibrate_rounds(target_ms: int) -> int:
+    """
+    Déterminer le facteur de coût bcrypt adapté à l'hôte courant.
+
+    Mesure la durée médiane de trois hachages au facteur minimal puis
+    extrapole : chaque incrément du facteur double le nombre
+    d'itérations, donc la durée. Seul le facteur minimal est mesuré,
+    le calibrage coûte ainsi quelques dizaines de millisecondes.
+
+    Args:
+        target_ms (int): Durée cible d'un hachage, en millisecondes.
+
+    Returns:
+        int: Plus grand facteur, borné entre ``BCRYPT_MIN_ROUNDS`` et
+            ``BCRYPT_MAX_ROUNDS``, dont la durée estimée reste
+            inférieure à ``target_ms``.
+    """
+    timings = []
+    for _ in range(3):
+        start = time.perf_counter()
+        bcrypt.hashpw(b"snaptaplaque-calibration", bcrypt.gensalt(BCRYPT_MIN_ROUNDS))
+        timings.append((time.perf_counter() - start) * 1000)
+
+    extra = math.floor(math.log2(target_ms / statistics.median(timings)))
+    return max(BCRYPT_MIN_ROUNDS, min(BCRYPT_MIN_ROUNDS + extra, BCRYPT_MAX_ROUNDS))
+
 
-# Instance globale du contexte cryptographique Passlib, configurée
-# avec l'algorithme bcrypt comme schéma principal de hachage. Le
-# paramètre ``deprecated="auto"`` permet à Passlib de marquer
-# automatiquement les anciens schémas comme obsolètes et de
-# re-hacher les mots de passe lors de la prochaine vérification
-# si un schéma plus récent est configuré.
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Facteur de coût effectif. Le calibrage ne concerne que les nouveaux
+# hashs : la vérification utilise toujours le facteur encodé dans le
+# hash stocké.
+if settings.BCRYPT_TARGET_MS > 0:
+    BCRYPT_ROUNDS = _calibrate_rounds(settings.BCRYPT_TARGET_MS)
+    logger.info("Facteur de coût bcrypt calibré: %d", BCRYPT_ROUNDS)
+else:
+    BCRYPT_ROUNDS = settings.BCRYPT_ROUNDS
 
 
 def get_password_hash(password: str) -> str:
@@ -45,7 +102,7 @@ def get_password_hash(password: str) -> str:
         str: Hash bcrypt du mot de passe, incluant le sel et le
             facteur de coût (format ``$2b$...``).
     """
-    return pwd_context.hash(password)
+    return bcrypt.hashpw(_encode(password), bcrypt.gensalt(BCRYPT_ROUNDS, b"2b")).decode("ascii")
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -65,6 +122,9 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
     Returns:
         bool: ``True`` si le mot de passe en clair correspond au hash,
-            ``False`` sinon.
+            ``False`` sinon, y compris si le hash stocké est malformé.
     """
-    return pwd_context.verify(plain_password, hashed_password)
+    try:
+        return bcrypt.checkpw(_encode(plain_password), hashed_password.encode("ascii"))
+    except (ValueError, UnicodeEncodeError):
+        return False
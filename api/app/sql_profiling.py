@@ -0,0 +1,103 @@
+"""
+sql_profiling.py — Profilage opt-in des requêtes SQL de l'API SnapTaPlaque.
+
+Ce module remplace la journalisation systématique des requêtes SQL
+(``echo=True`` sur le moteur SQLAlchemy), dont le coût de formatage
+et de dispatch vers ``logging`` était payé sur chaque requête dès que
+le mode debug était actif. Les écouteurs d'événements ne sont attachés
+au moteur que si ``settings.SQL_PROFILE`` est activé, lors d'une
+session de profilage ciblée.
+
+Fonctionnement :
+    - ``install`` attache des écouteurs ``before_cursor_execute`` et
+      ``after_cursor_execute`` au moteur afin de mesurer la durée de
+      chaque requête.
+    - Chaque requête est journalisée au niveau ``DEBUG`` sur le logger
+      ``app.sql_profiling``.
+    - ``record_statements`` collecte, dans le contexte d'exécution
+      courant (``ContextVar``), les requêtes émises au sein d'un bloc
+      ``with``.
+
+Exemple d'utilisation ::
+
+    from app.sql_profiling import record_statements
+
+    with record_statements() as statements:
+        crud.get_user_predictions(db, user_id)
+    for statement, duration in statements:
+        print(f"{duration * 1000:.2f} ms  {statement}")
+
+Version : 1.0.0
+"""
+
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Liste des requêtes collectées dans le contexte courant, sous forme
+# de couples ``(requête, durée en secondes)``. ``None`` lorsqu'aucun
+# bloc ``record_statements`` n'est actif.
+_recorded: ContextVar[Optional[list]] = ContextVar("sql_recorded_statements", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    """
+    Mémoriser l'instant de début d'exécution de la requête.
+
+    Les instants sont empilés dans ``conn.info`` pour supporter les
+    exécutions imbriquées sur une même connexion.
+    """
+    conn.info.setdefault("sql_profiling_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    """
+    Mesurer la durée de la requête, la journaliser et la collecter.
+
+    La requête n'est ajoutée à la liste du contexte courant que si un
+    bloc ``record_statements`` est actif.
+    """
+    duration = time.perf_counter() - conn.info["sql_profiling_start"].pop()
+    logger.debug("%.2f ms — %s", duration * 1000, statement)
+
+    recorded = _recorded.get()
+    if recorded is not None:
+        recorded.append((statement, duration))
+
+
+def install(engine: Engine) -> None:
+    """
+    Attacher les écouteurs de profilage au moteur SQLAlchemy.
+
+    Args:
+        engine (Engine): Moteur SQLAlchemy à instrumenter.
+    """
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+@contextmanager
+def record_statements() -> Iterator[list]:
+    """
+    Collecter les requêtes SQL émises dans le bloc ``with``.
+
+    Sans effet tant que ``install`` n'a pas été appelé sur le moteur
+    (``settings.SQL_PROFILE`` désactivé) : la liste reste alors vide.
+
+    Yields:
+        list: Liste des couples ``(requête, durée en secondes)``,
+            complétée au fil des exécutions.
+    """
+    recorded = []
+    token = _recorded.set(recorded)
+    try:
+        yield recorded
+    finally:
+        _recorded.reset(token)
@@ -0,0 +1,73 @@
+"""
+stats_cache.py — Cache TTL des réponses d'administration de l'API SnapTaPlaque.
+
+Les endpoints d'administration (liste des utilisateurs, statistiques
+globales) sont typiquement interrogés à intervalle fixe par un tableau
+de bord, et parcourent à chaque appel l'intégralité des tables
+``users`` et ``predictions``. Ce module mémorise leurs résultats
+pendant une courte durée (``settings.ADMIN_CACHE_TTL``), sans modifier
+les fonctions de ``app.crud`` qui restent sans état.
+
+Composants exposés :
+    - ``get_or_compute`` — Retourne la valeur en cache pour une clé, ou
+      la calcule et la mémorise.
+    - ``invalidate``     — Vide le cache, à appeler après toute
+      création ou suppression de compte.
+
+Version : 1.0.0
+"""
+
+import threading
+from typing import Any, Callable
+
+from cachetools import TTLCache
+
+from app.config import settings
+
+# Cache TTL des réponses d'administration, indexé par un nom de
+# ressource (``"users"``, ``"stats"``). Le nombre de clés est fixe et
+# très réduit. Un TTL nul désactive le cache.
+_cache: TTLCache = TTLCache(maxsize=8, ttl=max(settings.ADMIN_CACHE_TTL, 1))
+_cache_lock = threading.Lock()
+
+
+def get_or_compute(key: str, compute: Callable[[], Any]) -> Any:
+    """
+    Retourner la valeur en cache pour ``key``, ou la calculer.
+
+    Le calcul est effectué hors du verrou : deux requêtes simultanées
+    sur une entrée expirée peuvent toutes deux recalculer la valeur, ce
+    qui reste sans conséquence pour des lectures.
+
+    Args:
+        key (str): Nom de la ressource mise en cache.
+        compute (Callable[[], Any]): Fonction sans argument calculant
+            la valeur en cas d'absence dans le cache.
+
+    Returns:
+        Any: Valeur en cache ou nouvellement calculée.
+    """
+    if settings.ADMIN_CACHE_TTL <= 0:
+        return compute()
+
+    with _cache_lock:
+        value = _cache.get(key)
+    if value is not None:
+        return value
+
+    value = compute()
+    with _cache_lock:
+        _cache[key] = value
+    return value
+
+
+def invalidate() -> None:
+    """
+    Vider le cache des réponses d'administration.
+
+    À appeler après toute modification du nombre ou du contenu des
+    comptes utilisateurs (inscription, suppression) pour que le
+    prochain appel relise l'état à jour en base.
+    """
+    with _cache_lock:
+        _cache.clear()
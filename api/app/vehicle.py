@@ -31,7 +31,7 @@ def _get_oscaro_csrf_token() -> Tuple[Optional[str], Optional[httpx.Cookies]]:
         data = response.json()
         return data.get('csrf-token'), response.cookies
     except Exception as e:
-        logger.error(f"Erreur lors de la récupération du token CSRF: {e}")
+        logger.error("Erreur lors de la récupération du token CSRF: %s", e)
         return None, None
 
 def _fetch_vehicle_data_from_provider(plate: str) -> Optional[Dict[str, Any]]:
@@ -95,5 +95,5 @@ def _fetch_vehicle_data_from_provider(plate: str) -> Optional[Dict[str, Any]]:
         }
 
     except Exception as e:
-        logger.error(f"Erreur lors de la récupération des infos véhicule ({plate}): {e}")
+        logger.error("Erreur lors de la récupération des infos véhicule (%s): %s", plate, e)
         return None
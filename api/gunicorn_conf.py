@@ -0,0 +1,87 @@
+# ==============================================================================
+# gunicorn_conf.py — Gunicorn configuration for the SnapTaPlaque API
+# ==============================================================================
+# Production process manager: Gunicorn supervises N Uvicorn workers
+# (uvicorn.workers.UvicornWorker, uvloop + httptools) serving app.main:app.
+#
+# Usage:
+#   gunicorn app.main:app -c gunicorn_conf.py
+#
+# Environment variables:
+#   WEB_CONCURRENCY   — Number of worker processes (default: CPU / 2,
+#                       between 1 and 4)
+#   OMP_NUM_THREADS   — Inference threads per worker (default: CPU divided
+#                       evenly between the workers)
+#   GUNICORN_BIND     — Listen address (default: 0.0.0.0:8000)
+#   GUNICORN_PRELOAD  — "1" imports the application code once in the master
+#                       process before forking workers; "0" (default)
+#                       imports it in each worker. The recognition model is
+#                       always loaded by each worker, after fork
+#   GUNICORN_TIMEOUT  — Worker timeout in seconds (default: 120)
+# ==============================================================================
+
+import gc
+import multiprocessing
+import os
+
+# ------------------------------------------------------------------------------
+# Workers
+# ------------------------------------------------------------------------------
+# Each worker holds its own copy of the recognition model and runs
+# CPU-bound inference, so the usual 2 * CPU + 1 sizing for I/O-bound apps
+# would only multiply memory and thread contention. Within a worker,
+# concurrent requests are already coalesced by the batch queue.
+worker_class = "uvicorn.workers.UvicornWorker"
+cpu_count = multiprocessing.cpu_count()
+workers = int(os.getenv("WEB_CONCURRENCY", max(1, min(cpu_count // 2, 4))))
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+
+# Model loading can take several seconds on a cold cache; keep the worker
+# timeout well above it.
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+graceful_timeout = 30
+keepalive = 5
+
+# ------------------------------------------------------------------------------
+# Inference threads
+# ------------------------------------------------------------------------------
+# PyTorch (EasyOCR), OpenCV and ONNX Runtime (detector) each size their
+# thread pool to every core by default; with N workers that is N times too
+# many threads. The cores are split evenly between the workers instead.
+# Workers inherit this environment; ONNX Runtime does not read
+# OMP_NUM_THREADS itself, app.model.lpr_engine applies it to the detector
+# session (LPR_ORT_THREADS).
+threads_per_worker = str(max(1, cpu_count // workers))
+os.environ.setdefault("OMP_NUM_THREADS", threads_per_worker)
+os.environ.setdefault("MKL_NUM_THREADS", threads_per_worker)
+
+# ------------------------------------------------------------------------------
+# Application preloading
+# ------------------------------------------------------------------------------
+# With preload_app, app.main is imported once in the master process. The
+# recognition model is never loaded there (MODEL_PRELOAD is left unset):
+# ONNX Runtime sessions, OpenMP / intra-op thread pools and CUDA contexts
+# do not survive fork(), and workers could hang on their first inference.
+# Each worker loads the model in the background from the application
+# lifespan, after fork.
+preload_app = os.getenv("GUNICORN_PRELOAD", "0") == "1"
+
+
+def when_ready(server):
+    # Only matters with GUNICORN_PRELOAD=1 (no-op by default). Runs in the
+    # master after the preloaded app is imported, before the first fork.
+    # Freezing the collector moves every object created so far (imported
+    # modules) to a permanent generation: garbage collections in the
+    # workers no longer write to their headers, so the pages holding them
+    # stay shared instead of being copied into each worker. The recognition
+    # model is not among them: each worker loads its own copy after fork.
+    if preload_app:
+        gc.freeze()
+
+
+# ------------------------------------------------------------------------------
+# Logging
+# ------------------------------------------------------------------------------
+accesslog = "-"
+errorlog = "-"
+loglevel = os.getenv("GUNICORN_LOG_LEVEL", "info")
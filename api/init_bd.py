@@ -40,9 +40,11 @@ NOTE:
     issued by ``Base.metadata.create_all()``.
 """
 
+from concurrent.futures import ThreadPoolExecutor
+
 from sqlalchemy.orm import Session
-from app.database import SessionLocal, create_tables, User, Vehicle
-from app.auth import get_password_hash
+from app.database import SessionLocal, create_tables, User
+from app.security import get_password_hash
 import logging
 
 # Configure the root logger to INFO so that progress messages are visible
@@ -81,42 +83,69 @@ def init_database():
     db: Session = SessionLocal()
 
     try:
+        # A single round-trip tells which seed accounts already exist.
+        existing = {
+            username
+            for (username,) in db.query(User.username)
+            .filter(User.username.in_(["admin", "testuser"]))
+            .all()
+        }
+        existing_admin = "admin" in existing
+        existing_test = "testuser" in existing
+
         # ----------------------------------------------------------------------
-        # Seed: Administrator account
+        # Password hashing
         # ----------------------------------------------------------------------
-        existing_admin = db.query(User).filter(User.username == "admin").first()
+        # Only the missing accounts are hashed, and in parallel: bcrypt
+        # releases the GIL, so the two key derivations overlap instead of
+        # running back to back on a fresh database.
+        passwords = {}
+        if not existing_admin:
+            passwords["admin"] = "admin123"
+        if not existing_test:
+            passwords["testuser"] = "test123"
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            hashes = dict(zip(passwords, executor.map(get_password_hash, passwords.values())))
 
+        new_users = []
+
+        # ----------------------------------------------------------------------
+        # Seed: Administrator account
+        # ----------------------------------------------------------------------
         if existing_admin:
             logger.info("✅ L'utilisateur admin existe déjà")
         else:
             admin = User(
                 email="admin@credit-scoring.com",
                 username="admin",
-                hashed_password=get_password_hash("admin123"),
+                hashed_password=hashes["admin"],
                 full_name="Administrator",
                 is_active=True,
                 is_admin=True,
             )
-            db.add(admin)
-            db.commit()
-            logger.info("✅ Utilisateur admin créé (username: admin, password: admin123)")
+            new_users.append(admin)
 
         # ----------------------------------------------------------------------
         # Seed: Test / QA user account
         # ----------------------------------------------------------------------
-        existing_test = db.query(User).filter(User.username == "testuser").first()
-
         if not existing_test:
             test_user = User(
                 email="test@example.com",
                 username="testuser",
-                hashed_password=get_password_hash("test123"),
+                hashed_password=hashes["testuser"],
                 full_name="Test User",
                 is_active=True,
                 is_admin=False,
             )
-            db.add(test_user)
+            new_users.append(test_user)
+
+        # Both seed accounts are inserted in one transaction.
+        if new_users:
+            db.add_all(new_users)
             db.commit()
+        if not existing_admin:
+            logger.info("✅ Utilisateur admin créé (username: admin, password: admin123)")
+        if not existing_test:
             logger.info("✅ Utilisateur de test créé (username: testuser, password: test123)")
 
         logger.info("✅ Base de données initialisée avec succès")